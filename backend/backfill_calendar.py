@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Script para generar el calendario de emociones materializado de los usuarios
+existentes a partir de sus notas
+
+Uso:
+    python backfill_calendar.py                 # todos los usuarios con notas
+    python backfill_calendar.py ana@correo.com  # solo los usuarios indicados
+"""
+import os
+import sys
+from dotenv import load_dotenv
+import firebase_admin
+from firebase_admin import credentials, firestore
+
+from emotion_calendar import backfill_calendar
+
+load_dotenv()
+
+
+def main(emails):
+    cred_path = os.getenv('FIREBASE_CREDENTIALS')
+    if not cred_path or not os.path.exists(cred_path):
+        print("❌ Archivo de credenciales no encontrado")
+        return 1
+
+    if not firebase_admin._apps:
+        firebase_admin.initialize_app(credentials.Certificate(cred_path))
+    db = firestore.client()
+
+    if not emails:
+        print("🔎 Buscando usuarios con notas...")
+        emails = sorted({
+            note.to_dict().get('email')
+            for note in db.collection('notas').select(['email']).stream()
+            if note.to_dict().get('email')
+        })
+
+    print("=" * 60)
+    print(f"📅 Generando calendario para {len(emails)} usuario(s)")
+    print("=" * 60)
+
+    failed = 0
+    for email in emails:
+        try:
+            days = backfill_calendar(db, email)
+            print(f"✓ {email}: {len(days)} días")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {email}: {str(e)}")
+
+    print("=" * 60)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,75 @@
+"""
+Ejecución de tareas en segundo plano, fuera del camino de la respuesta
+"""
+import atexit
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+try:
+    from logs import get_logger
+except ImportError:
+    from backend.logs import get_logger
+
+log = get_logger(__name__)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Pool de hilos que ejecuta cada tarea con los contextvars de quien la lanza"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class BackgroundExecutor:
+    """Pool de hilos con un máximo de tareas pendientes y vaciado al apagar el proceso"""
+
+    def __init__(self, max_workers, max_pending, flush_timeout=10):
+        self.flush_timeout = flush_timeout
+        self._executor = ContextThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="zenith-bg"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            # Cola llena: se ejecuta en línea para no perder la tarea
+            log.warning("background_queue_full")
+            self._run(fn, args, kwargs)
+            return None
+
+        future = self._executor.submit(self._run, fn, args, kwargs)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, fn, args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            log.exception(
+                "background_task_failed", task=getattr(fn, "__name__", str(fn))
+            )
+
+    def _release(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def flush(self, timeout=None):
+        with self._lock:
+            pending = list(self._pending)
+        if pending:
+            wait(pending, timeout=timeout)
+
+    def shutdown(self):
+        self.flush(self.flush_timeout)
+        self._executor.shutdown(wait=False)
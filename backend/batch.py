@@ -0,0 +1,66 @@
+"""
+POST /api/batch: varias lecturas GET en una sola petición. Cada subpetición
+pasa por la vista de su ruta como si llegara sola, pero sin los hooks de
+before/after_request (métricas y compresión se aplican al lote entero).
+"""
+from werkzeug.exceptions import HTTPException
+
+# Rutas que no tienen sentido dentro de un lote
+EXCLUDED_RULES = {
+    "/api/batch",
+    "/api/warmup",
+    "/api/debug-firebase",
+    "/api/metrics",
+    "/api/export",
+}
+
+
+def parse_batch(payload, max_requests):
+    """[(id, path)] a partir de {"requests": [{"id", "path", "method"}]}"""
+    items = payload.get("requests") if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError("'requests' must be a non-empty list")
+    if len(items) > max_requests:
+        raise ValueError(f"At most {max_requests} requests per batch")
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("path"), str):
+            raise ValueError(f"Request {index} needs a 'path'")
+        if item.get("method", "GET").upper() != "GET":
+            raise ValueError("Only GET requests can be batched")
+        if not item["path"].startswith("/api/"):
+            raise ValueError(f"Invalid path: {item['path']}")
+        parsed.append((str(item.get("id", index)), item["path"]))
+    return parsed
+
+
+def dispatch(app, path, headers):
+    """(estado, cuerpo JSON en bytes) de la vista que atiende GET `path`"""
+    with app.test_request_context(path, method="GET", headers=headers) as ctx:
+        try:
+            rule = ctx.request.url_rule
+            if rule is not None and rule.rule in EXCLUDED_RULES:
+                return 400, app.json.dumps({"error": "Route not allowed in a batch"})
+            response = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            return e.code, app.json.dumps({"error": e.description})
+
+        body = response.get_data()
+        if not response.is_json:
+            body = app.json.dumps(body.decode("utf-8", "replace"))
+        return response.status_code, body
+
+
+def encode_results(app, results):
+    """
+    {"responses": [{"id", "status", "body"}]} pegando los cuerpos ya
+    serializados por cada vista, sin volver a parsearlos
+    """
+    parts = []
+    for request_id, status, body in results:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        head = app.json.dumps({"id": request_id, "status": status}).encode("utf-8")
+        parts.append(head.rstrip()[:-1] + b',"body":' + body + b"}")
+    return b'{"responses":[' + b",".join(parts) + b"]}"
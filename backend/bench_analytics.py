@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark de /api/analytics/mood: mide cuánto tarda el cálculo con NumPy
+para usuarios con muchas notas (sin Firestore, con datos sintéticos)
+"""
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from mood_analytics import EMOTION_NAMES, notes_to_arrays, compute_mood_analytics
+
+SIZES = [100, 1_000, 10_000, 50_000]
+RUNS = 20
+
+
+def synthetic_notes(count, now):
+    """Genera etiquetas y timestamps repartidos en los últimos 4 años"""
+    labels = [random.choice(EMOTION_NAMES) for _ in range(count)]
+    timestamps = [
+        (now - timedelta(seconds=random.randint(0, 4 * 365 * 86400))).timestamp()
+        for _ in range(count)
+    ]
+    return labels, timestamps
+
+
+def measure(labels, timestamps, now):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        emotions, seconds = notes_to_arrays(labels, timestamps)
+        compute_mood_analytics(emotions, seconds, now)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+
+    print("=" * 60)
+    print("📊 Benchmark de analíticas de estado de ánimo")
+    print("=" * 60)
+    print(f"{'notas':>10} {'p50 (ms)':>12} {'p95 (ms)':>12}")
+
+    for size in SIZES:
+        labels, timestamps = synthetic_notes(size, now)
+        p50, p95 = measure(labels, timestamps, now)
+        print(f"{size:>10,} {p50:>12.2f} {p95:>12.2f}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
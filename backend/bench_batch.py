@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la carga inicial en frío (emociones, consejos, calendario, notas
+e historial): cinco peticiones una tras otra, cinco en paralelo como
+Promise.all, o un solo POST /api/batch.
+
+Simula un navegador en otro origen contra un servidor local: cada petición
+abre su conexión y va precedida del preflight CORS (lleva Authorization), y
+cada viaje de ida y vuelta suma --rtt. Firestore en memoria con --db-latency
+por lectura y verificación de tokens con --auth-latency (la caché de tokens se
+vacía antes de cada carga).
+
+    python bench_batch.py
+    python bench_batch.py --rtt 0.08 --db-latency 0.03 --runs 30
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from firebase_admin import auth
+from werkzeug.serving import make_server
+
+import bench_endpoints
+from fakes import fake_verify_token
+
+backend = bench_endpoints.backend
+verify_token = backend.verify_token
+
+ORIGIN = backend.app.config["CORS_ORIGINS"][0]
+HOME = [
+    "/api/emotions",
+    "/api/tips",
+    "/api/calendar/emotions",
+    "/api/notes?page_size=20",
+    "/api/chat/history?limit=10",
+]
+
+
+def fake_verify_id_token(latency, calls):
+    def verify_id_token(token, check_revoked=False):
+        # Lo que tarda firebase_admin en validar un token que no está en caché
+        calls.append(token)
+        time.sleep(latency)
+        return fake_verify_token(token)
+
+    return verify_id_token
+
+
+def start_server(port):
+    server = make_server("127.0.0.1", port, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Browser:
+    """Cliente HTTP en otro origen: conexión nueva por petición y preflight CORS"""
+
+    def __init__(self, port, uid, rtt):
+        self.port = port
+        self.uid = uid
+        self.rtt = rtt
+
+    def _round_trip(self, conn, method, path, body=None, headers=None):
+        time.sleep(self.rtt)
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        data = response.read()
+        return response.status, data
+
+    def fetch(self, method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=30)
+        try:
+            # Establecer la conexión TCP también cuesta un viaje
+            time.sleep(self.rtt)
+            conn.connect()
+            request_headers = "authorization,content-type" if body else "authorization"
+            status, _ = self._round_trip(
+                conn,
+                "OPTIONS",
+                path,
+                headers={
+                    "Origin": ORIGIN,
+                    "Access-Control-Request-Method": method,
+                    "Access-Control-Request-Headers": request_headers,
+                },
+            )
+            if status >= 400:
+                raise RuntimeError(f"Preflight {path} -> {status}")
+            headers = {"Origin": ORIGIN, "Authorization": f"Bearer {self.uid}"}
+            if body is not None:
+                headers["Content-Type"] = "application/json"
+                body = json.dumps(body)
+            return self._round_trip(conn, method, path, body, headers)
+        finally:
+            conn.close()
+
+
+def sequential(browser):
+    return [browser.fetch("GET", path)[0] for path in HOME]
+
+
+def parallel(browser):
+    with ThreadPoolExecutor(max_workers=len(HOME)) as executor:
+        return [
+            status
+            for status, _ in executor.map(lambda p: browser.fetch("GET", p), HOME)
+        ]
+
+
+def batched(browser):
+    requests = [{"id": str(index), "path": path} for index, path in enumerate(HOME)]
+    status, data = browser.fetch("POST", "/api/batch", {"requests": requests})
+    if status != 200:
+        return [status]
+    return [item["status"] for item in json.loads(data)["responses"]]
+
+
+STRATEGIES = [
+    ("5 peticiones en serie", sequential),
+    ("5 peticiones en paralelo", parallel),
+    ("POST /api/batch", batched),
+]
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", type=int, default=1_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--rtt", type=float, default=0.05)
+    parser.add_argument("--db-latency", type=float, default=0.02)
+    parser.add_argument("--auth-latency", type=float, default=0.01)
+    parser.add_argument("--port", type=int, default=5058)
+    args = parser.parse_args()
+
+    # Sin el log de cada petición del servidor de desarrollo
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    db = bench_endpoints.install_fakes(0)
+    backend.verify_token = verify_token
+    verifications = []
+    auth.verify_id_token = fake_verify_id_token(args.auth_latency, verifications)
+    uid = "bench-home"
+    bench_endpoints.seed_user(db, uid, args.notes, datetime.now(timezone.utc))
+    db.latency = args.db_latency
+    server = start_server(args.port)
+    browser = Browser(args.port, uid, args.rtt)
+
+    print("=" * 78)
+    print(
+        "⏱  Carga inicial en frío (emociones, consejos, calendario, notas, historial)"
+    )
+    print(
+        f"   {args.notes:,} notas, RTT {args.rtt * 1000:.0f} ms, "
+        f"lectura de Firestore {args.db_latency * 1000:.0f} ms, "
+        f"verificación del token {args.auth_latency * 1000:.0f} ms"
+    )
+    print("=" * 78)
+    print(
+        f"{'estrategia':<28} {'viajes':>7} {'tokens':>7} {'p50 (ms)':>10} "
+        f"{'p99 (ms)':>10} {'errores':>8}"
+    )
+    try:
+        for name, strategy in STRATEGIES:
+            samples, errors = [], 0
+            verifications.clear()
+            for _ in range(args.runs):
+                backend.token_cache.clear()
+                start = time.perf_counter()
+                statuses = strategy(browser)
+                samples.append(time.perf_counter() - start)
+                errors += sum(status != 200 for status in statuses)
+            trips = 3 * (1 if strategy is batched else len(HOME))
+            print(
+                f"{name:<28} {trips:>7} {len(verifications) / args.runs:>7.0f} "
+                f"{percentile(samples, 0.5) * 1000:>10.1f} "
+                f"{percentile(samples, 0.99) * 1000:>10.1f} {errors:>8}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío: en un proceso nuevo por medición, cuánto tarda
+`import app` y la primera respuesta de cada ruta (como una instancia de Vercel)
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROUTES = ["/api/health", "/api/emotions", "/api/tips", "/api/warmup"]
+RUNS = 7
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get(sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (imported - start) * 1000,
+    "first_ms": (done - imported) * 1000,
+}))
+"""
+
+
+def probe(route):
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, route],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    print("=" * 60)
+    print("🧊 Benchmark de arranque en frío")
+    print("=" * 60)
+    print(f"{'ruta':<18} {'estado':>6} {'import (ms)':>12} {'1ª resp. (ms)':>14}")
+
+    for route in ROUTES:
+        samples = [probe(route) for _ in range(RUNS)]
+        import_ms = statistics.median(s["import_ms"] for s in samples)
+        first_ms = statistics.median(s["first_ms"] for s in samples)
+        print(
+            f"{route:<18} {samples[-1]['status']:>6} "
+            f"{import_ms:>12.1f} {first_ms:>14.1f}"
+        )
+
+    print("=" * 60)
+    print(f"Mediana de {RUNS} procesos por ruta")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los endpoints sin servicios reales: Firestore en memoria, Gemini
+falso con latencia configurable y verify_token que acepta cualquier token.
+Mide p50/p99 y peticiones por segundo para usuarios con distinto número de notas.
+
+    python bench_endpoints.py
+    python bench_endpoints.py --sizes 10 1000 --requests 500 --concurrency 4
+    python bench_endpoints.py --storage sqlite
+"""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+# Sin logs informativos durante las mediciones
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import app as backend
+import emotion_calendar
+from fakes import FakeFirestore, FakeGeminiModel, fake_verify_token
+from models import Emotion
+from storage import SqliteStorage
+
+SIZES = [10, 1_000, 50_000]
+PSYCHOLOGISTS = 50
+
+
+def install_fakes(gemini_latency, storage_backend="firestore"):
+    db = FakeFirestore()
+    backend.services.firebase.set(db)
+    backend.services.gemini.set(
+        backend.services.gemini_guard.wrap(
+            backend.metrics.instrument_model(FakeGeminiModel(gemini_latency))
+        )
+    )
+    if storage_backend == "sqlite":
+        directory = tempfile.mkdtemp(prefix="zenith-bench-")
+        backend.services.storage.set(SqliteStorage(os.path.join(directory, "bench.db")))
+    backend.verify_token = fake_verify_token
+    return db
+
+
+def commit_in_batches(db, writes):
+    batch = db.batch()
+    for count, (ref, data) in enumerate(writes, 1):
+        batch.set(ref, data)
+        if count % 500 == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+
+def seed_user(db, uid, size, now):
+    """Crea `size` notas y `size` mensajes repartidos en los últimos 3 años"""
+    email = fake_verify_token(uid)["email"]
+    notes = db.collection("notas")
+    messages = db.collection("conversaciones").document(uid).collection("mensajes")
+
+    def note(i):
+        emotion = random.choice(Emotion.EMOTIONS)
+        return notes.document(), {
+            "email": email,
+            "title": f"Nota {i}",
+            "content": "Hoy fue un día como cualquier otro. " * 4,
+            "emotion_name": emotion["name"],
+            "emotion_emoji": emotion["emoji"],
+            "timestamp": now - timedelta(seconds=random.randint(0, 3 * 365 * 86400)),
+        }
+
+    def message(i):
+        return messages.document(), {
+            "user_id": uid,
+            "text": f"Mensaje {i}",
+            "is_user_message": i % 2 == 0,
+            "timestamp": now - timedelta(seconds=size - i),
+        }
+
+    commit_in_batches(db, (note(i) for i in range(size)))
+    commit_in_batches(db, (message(i) for i in range(size)))
+    emotion_calendar.backfill_calendar(db, email)
+
+
+def seed_user_sqlite(storage, uid, size, now):
+    """Igual que seed_user pero insertando directamente en SQLite"""
+    email = fake_verify_token(uid)["email"]
+    notes = []
+    for i in range(size):
+        emotion = random.choice(Emotion.EMOTIONS)
+        seconds = now - timedelta(seconds=random.randint(0, 3 * 365 * 86400))
+        notes.append(
+            (
+                f"{uid}-n{i}",
+                email,
+                f"Nota {i}",
+                "Hoy fue un día como cualquier otro. " * 4,
+                emotion["name"],
+                emotion["emoji"],
+                seconds.timestamp(),
+            )
+        )
+    storage.database.executemany(
+        "INSERT INTO notas (id, email, title, content, emotion_name, "
+        "emotion_emoji, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        notes,
+    )
+    storage.database.executemany(
+        "INSERT INTO mensajes VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f"{uid}-m{i}",
+                uid,
+                f"Mensaje {i}",
+                i % 2 == 0,
+                (now - timedelta(seconds=size - i)).timestamp(),
+            )
+            for i in range(size)
+        ),
+    )
+
+
+def client_sync_token(headers):
+    response = backend.app.test_client().get("/api/notes/sync?limit=0", headers=headers)
+    return response.get_json()["since"]
+
+
+def endpoints(uid, now):
+    """
+    (nombre, petición, preparación) para cada endpoint. La preparación se
+    ejecuta fuera de la medición y su resultado se pasa a la petición.
+    """
+    headers = {"Authorization": f"Bearer {uid}"}
+    month = now.strftime("%Y-%m")
+    year_ago = (now - timedelta(days=365)).strftime("%Y-%m")
+    email = fake_verify_token(uid)["email"]
+
+    def get(path):
+        return lambda client, _: client.get(path, headers=headers)
+
+    def post(path, body):
+        return lambda client, _: client.post(path, json=body, headers=headers)
+
+    def disposable_note():
+        return backend.get_storage().notes.create(
+            {"email": email, "emotion_emoji": "😊", "timestamp": now}
+        )
+
+    synced = []
+
+    def sync_token():
+        # Token de un cliente que ya tiene todas las notas: el delta sale vacío
+        if not synced:
+            synced.append(client_sync_token(headers))
+        return synced[0]
+
+    # Las lecturas van primero para medirlas con el número exacto de notas
+    return [
+        ("GET /api/health", get("/api/health"), None),
+        ("GET /api/emotions", get("/api/emotions"), None),
+        ("GET /api/tips", get("/api/tips"), None),
+        ("GET /api/psychologists", get("/api/psychologists"), None),
+        ("GET /api/notes", get("/api/notes"), None),
+        ("GET /api/notes?all=1", get("/api/notes?all=1"), None),
+        (
+            "GET /api/notes/sync?since=",
+            lambda client, since: client.get(
+                f"/api/notes/sync?since={since}", headers=headers
+            ),
+            sync_token,
+        ),
+        ("GET /api/calendar/emotions", get("/api/calendar/emotions"), None),
+        (
+            "GET /api/calendar/emotions (12m)",
+            get(f"/api/calendar/emotions?from={year_ago}&to={month}"),
+            None,
+        ),
+        ("GET /api/analytics/mood", get("/api/analytics/mood"), None),
+        ("GET /api/chat/history", get("/api/chat/history?page_size=50"), None),
+        ("GET /api/metrics", get("/api/metrics"), None),
+        (
+            "POST /api/notes",
+            post(
+                "/api/notes",
+                {"title": "Nueva", "emotion_name": "Feliz", "emotion_emoji": "😊"},
+            ),
+            None,
+        ),
+        (
+            "DELETE /api/notes/<id>",
+            lambda client, note_id: client.delete(
+                f"/api/notes/{note_id}", headers=headers
+            ),
+            disposable_note,
+        ),
+        ("POST /api/chat/send", post("/api/chat/send", {"message": "Hola"}), None),
+    ]
+
+
+def percentile(samples, fraction):
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+
+def measure(request, prepare, total, concurrency, max_seconds):
+    """Lanza hasta `total` peticiones repartidas entre `concurrency` hilos"""
+    deadline = time.perf_counter() + max_seconds
+
+    def worker(offset):
+        client = backend.app.test_client()
+        samples, errors = [], 0
+        for i in range(offset, total, concurrency):
+            if time.perf_counter() > deadline:
+                break
+            arg = prepare() if prepare else i
+            start = time.perf_counter()
+            response = request(client, arg)
+            samples.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+        return samples, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    samples = sorted(sample for result, _ in results for sample in result)
+    errors = sum(errors for _, errors in results)
+    return {
+        "requests": len(samples),
+        "p50": percentile(samples, 0.5) * 1000,
+        "p99": percentile(samples, 0.99) * 1000,
+        "rps": len(samples) / elapsed,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=5.0)
+    parser.add_argument(
+        "--storage", choices=["firestore", "sqlite"], default="firestore"
+    )
+    parser.add_argument(
+        "--gemini-latency",
+        type=float,
+        default=0.0,
+        help="segundos que tarda el Gemini falso en responder",
+    )
+    args = parser.parse_args()
+
+    random.seed(42)
+    now = datetime.now(timezone.utc)
+    db = install_fakes(args.gemini_latency, args.storage)
+    storage = backend.get_storage()
+    for i in range(PSYCHOLOGISTS):
+        storage.psychologists.create(
+            {"nombre": f"Psicólogo {i}", "especialidad": "Ansiedad"}
+        )
+
+    print("=" * 86)
+    backend_name = "SQLite" if args.storage == "sqlite" else "Firestore en memoria"
+    print(f"⏱  Benchmark de endpoints ({backend_name}, Gemini falso)")
+    print(
+        f"   {args.requests} peticiones por endpoint, concurrencia {args.concurrency}, "
+        f"latencia de Gemini {args.gemini_latency * 1000:.0f} ms"
+    )
+    print("=" * 86)
+    print(
+        f"{'notas':>7} {'endpoint':<34} {'n':>5} {'p50 (ms)':>9} "
+        f"{'p99 (ms)':>9} {'req/s':>9} {'errores':>8}"
+    )
+
+    for size in args.sizes:
+        uid = f"bench-{size}"
+        if args.storage == "sqlite":
+            seed_user_sqlite(storage, uid, size, now)
+        else:
+            seed_user(db, uid, size, now)
+        for name, request, prepare in endpoints(uid, now):
+            # Una petición previa para llenar cachés y cargar módulos perezosos
+            request(backend.app.test_client(), prepare() if prepare else 0)
+            result = measure(
+                request, prepare, args.requests, args.concurrency, args.max_seconds
+            )
+            print(
+                f"{size:>7,} {name:<34} {result['requests']:>5} "
+                f"{result['p50']:>9.2f} {result['p99']:>9.2f} "
+                f"{result['rps']:>9.1f} {result['errors']:>8}"
+            )
+        print("-" * 86)
+
+    backend.background.flush(10)
+
+
+if __name__ == "__main__":
+    main()
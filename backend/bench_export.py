@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de GET /api/export frente al listado completo GET /api/notes?all=1:
+tiempo hasta el primer byte, tiempo total, bytes enviados y pico de memoria
+(tracemalloc) durante la petición, para usuarios con distinto número de notas.
+
+    python bench_export.py
+    python bench_export.py --sizes 1000 50000 --storage sqlite
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import bench_endpoints
+
+backend = bench_endpoints.backend
+
+SIZES = [1_000, 10_000, 50_000]
+REQUESTS = [
+    ("GET /api/notes?all=1", "/api/notes?all=1", {}),
+    ("export NDJSON (notas)", "/api/export?include=notes", {}),
+    ("export NDJSON gzip (notas)", "/api/export?include=notes", {"gzip": True}),
+    ("export CSV (notas)", "/api/export?format=csv&include=notes", {}),
+    ("export NDJSON (notas y chat)", "/api/export", {"gzip": True}),
+]
+
+
+def fetch(client, path, headers):
+    """(segundos hasta el primer byte, segundos en total, bytes, estado)"""
+    start = time.perf_counter()
+    response = client.get(path, headers=headers, buffered=False)
+    first_byte = None
+    size = 0
+    try:
+        for chunk in response.response:
+            if chunk and first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    finally:
+        response.close()
+    total = time.perf_counter() - start
+    return first_byte or total, total, size, response.status_code
+
+
+def peak_memory(client, path, headers):
+    """Pico de memoria asignada mientras se genera y se consume la respuesta"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    fetch(client, path, headers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument(
+        "--storage", choices=["firestore", "sqlite"], default="firestore"
+    )
+    args = parser.parse_args()
+
+    db = bench_endpoints.install_fakes(0, args.storage)
+    client = backend.app.test_client()
+    now = datetime.now(timezone.utc)
+
+    print("=" * 96)
+    print(f"⏱  Exportación en streaming ({args.storage})")
+    print("=" * 96)
+    print(
+        f"{'notas':>7} {'petición':<30} {'primer byte (ms)':>17} "
+        f"{'total (ms)':>11} {'KiB':>9} {'pico (KiB)':>11}"
+    )
+    for size in args.sizes:
+        uid = f"bench-export-{size}"
+        if args.storage == "sqlite":
+            storage = backend.services.storage.get()
+            bench_endpoints.seed_user_sqlite(storage, uid, size, now)
+        else:
+            bench_endpoints.seed_user(db, uid, size, now)
+
+        for name, path, options in REQUESTS:
+            headers = {"Authorization": f"Bearer {uid}"}
+            if options.get("gzip"):
+                headers["Accept-Encoding"] = "gzip"
+            # Una vez antes de medir: el Firestore en memoria ordena y cachea
+            fetch(client, path, headers)
+            first_byte, total, sent, status = fetch(client, path, headers)
+            if status != 200:
+                print(f"{size:>7,} {name:<30} error {status}")
+                continue
+            peak = peak_memory(client, path, headers)
+            print(
+                f"{size:>7,} {name:<30} {first_byte * 1000:>17.1f} "
+                f"{total * 1000:>11.1f} {sent / 1024:>9,.0f} {peak / 1024:>11,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la serialización de listados de notas: el camino anterior
+(isoformat nota a nota + json de Flask) frente a los proveedores de
+json_provider.py, y bytes enviados con cada nivel de compresión.
+
+    python bench_json.py
+    python bench_json.py --sizes 100 5000 --repeat 20
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from compression import DYNAMIC_LEVELS, ENCODINGS, STATIC_LEVELS, compress
+from json_provider import IsoJSONProvider, OrjsonProvider, orjson
+from models import Emotion
+
+SIZES = [100, 1_000, 10_000]
+
+
+def make_notes(size):
+    """Notas como las devuelve Firestore, con DatetimeWithNanoseconds"""
+    now = datetime.now(timezone.utc)
+    notes = []
+    for i in range(size):
+        emotion = random.choice(Emotion.EMOTIONS)
+        moment = now - timedelta(seconds=random.randint(0, 3 * 365 * 86400))
+        notes.append(
+            {
+                "id": f"{i:020d}",
+                "email": "usuario@example.com",
+                "title": f"Nota {i}",
+                "content": "Hoy fue un día como cualquier otro. " * 4,
+                "emotion_name": emotion["name"],
+                "emotion_emoji": emotion["emoji"],
+                "timestamp": DatetimeWithNanoseconds(
+                    *moment.timetuple()[:6], moment.microsecond, tzinfo=timezone.utc
+                ),
+            }
+        )
+    return notes
+
+
+def previous_path(provider, notes):
+    """Lo que hacía GET /api/notes?all=1: copia, isoformat en Python y json.dumps"""
+    serialized = []
+    for note in notes:
+        note = dict(note)
+        note["timestamp"] = note["timestamp"].isoformat()
+        serialized.append(note)
+    return provider.dumps(serialized).encode("utf-8")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    random.seed(42)
+    app = Flask(__name__)
+    default = DefaultJSONProvider(app)
+    iso = IsoJSONProvider(app)
+    serializers = [
+        ("isoformat + json de Flask", lambda notes: previous_path(default, notes)),
+        ("IsoJSONProvider (json)", lambda notes: iso.dumps(notes).encode("utf-8")),
+    ]
+    if orjson is not None:
+        fast = OrjsonProvider(app)
+        serializers.append(("OrjsonProvider", fast.dumps_bytes))
+
+    print("=" * 78)
+    print(
+        "⏱  Serialización de listados de notas (mejor de", args.repeat, "repeticiones)"
+    )
+    print("=" * 78)
+    for size in args.sizes:
+        notes = make_notes(size)
+        print(f"\n{size:,} notas")
+        print(f"  {'serializador':<34} {'ms':>9} {'bytes':>11}")
+        body = None
+        for name, serialize in serializers:
+            ms, body = timed(lambda: serialize(notes), args.repeat)
+            print(f"  {name:<34} {ms:>9.2f} {len(body):>11,}")
+
+        print(f"  {'compresión':<34} {'ms':>9} {'bytes':>11} {'ratio':>7}")
+        for encoding in ENCODINGS:
+            levels = sorted({DYNAMIC_LEVELS[encoding], STATIC_LEVELS[encoding]})
+            for level in levels:
+                # El nivel máximo de brotli tarda segundos: se mide una sola vez
+                repeat = args.repeat if level == DYNAMIC_LEVELS[encoding] else 1
+                ms, compressed = timed(lambda: compress(body, encoding, level), repeat)
+                label = f"{encoding} nivel {level}"
+                if level == DYNAMIC_LEVELS[encoding]:
+                    label += " (respuestas)"
+                print(
+                    f"  {label:<34} {ms:>9.2f} {len(compressed):>11,} "
+                    f"{len(body) / len(compressed):>6.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
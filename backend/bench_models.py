@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks de los esquemas de models.py frente a los modelos anteriores
+(clases con __dict__ y cuerpos leídos con data.get): decodificación y
+validación de cuerpos, to_dict, serialización a JSON y memoria por instancia.
+
+    python bench_models.py
+    python bench_models.py --number 200000
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+
+from flask import Flask
+
+from json_provider import IsoJSONProvider, OrjsonProvider, orjson
+from models import ChatMessage, Note, Psicologo
+
+NOTE_BODY = {
+    "title": "Un buen día",
+    "content": "Hoy fue un día como cualquier otro. " * 8,
+    "emotion_name": "Feliz",
+    "emotion_emoji": "😊",
+}
+CHAT_BODY = {"message": "Hoy me siento un poco mejor, gracias por escucharme."}
+PSYCHOLOGIST_BODY = {
+    "nombre": "Ana Pérez",
+    "especialidad": "Terapia cognitivo-conductual",
+    "telefonoCelular": "+52 55 1234 5678",
+    "telefonoOficina": "+52 55 8765 4321",
+    "correoElectronico": "ana@example.com",
+    "direccion": "Av. Siempre Viva 742",
+    "ubicacionUrl": "https://maps.example.com/?q=ana",
+    "fotoUrl": "https://example.com/ana.jpg",
+}
+
+
+class LegacyChatMessage:
+    """ChatMessage anterior: atributos en __dict__ y un dict nuevo en cada to_dict"""
+
+    def __init__(self, user_id, text, is_user_message, timestamp=None):
+        self.user_id = user_id
+        self.text = text
+        self.is_user_message = is_user_message
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "text": self.text,
+            "is_user_message": self.is_user_message,
+            "timestamp": self.timestamp,
+        }
+
+
+def legacy_note(email, data):
+    """Lo que hacía insert_note con request.json"""
+    return {
+        "email": email,
+        "title": data.get("title", ""),
+        "content": data.get("content", ""),
+        "emotion_name": data.get("emotion_name", ""),
+        "emotion_emoji": data.get("emotion_emoji", ""),
+    }
+
+
+def legacy_psychologist(data):
+    return {
+        "nombre": data.get("nombre", ""),
+        "especialidad": data.get("especialidad", ""),
+        "telefonoCelular": data.get("telefonoCelular", ""),
+        "telefonoOficina": data.get("telefonoOficina", ""),
+        "correoElectronico": data.get("correoElectronico", ""),
+        "direccion": data.get("direccion", ""),
+        "ubicacionUrl": data.get("ubicacionUrl", ""),
+        "fotoUrl": data.get("fotoUrl", ""),
+    }
+
+
+def legacy_chat(data):
+    message = data.get("message", "")
+    if not message:
+        raise ValueError("Message is required")
+    return LegacyChatMessage("uid", message, True).to_dict()
+
+
+def ops_per_second(fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    return number / best
+
+
+def allocated(factory, count):
+    """Bytes asignados por instancia al crear `count` instancias"""
+    tracemalloc.start()
+    instances = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=1_000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    provider = OrjsonProvider(app) if orjson is not None else IsoJSONProvider(app)
+    loads = provider.loads
+    dumps = provider.dumps_bytes if orjson is not None else provider.dumps
+    bodies = {
+        "note": provider.dumps(NOTE_BODY),
+        "chat": provider.dumps(CHAT_BODY),
+        "psychologist": provider.dumps(PSYCHOLOGIST_BODY),
+    }
+
+    decoders = [
+        (
+            "nota",
+            lambda: legacy_note("u@example.com", loads(bodies["note"])),
+            lambda: Note.from_json(
+                loads(bodies["note"]), email="u@example.com"
+            ).to_dict(),
+        ),
+        (
+            "mensaje del chat",
+            lambda: legacy_chat(loads(bodies["chat"])),
+            lambda: ChatMessage.from_json(
+                loads(bodies["chat"]), user_id="uid", is_user_message=True
+            ).to_dict(),
+        ),
+        (
+            "psicólogo",
+            lambda: legacy_psychologist(loads(bodies["psychologist"])),
+            lambda: Psicologo.from_json(loads(bodies["psychologist"])).to_dict(),
+        ),
+    ]
+
+    now = datetime.now(timezone.utc)
+    legacy_messages = [
+        LegacyChatMessage("uid", f"Mensaje {i}", i % 2 == 0, now)
+        for i in range(args.messages)
+    ]
+    messages = [
+        ChatMessage("uid", f"Mensaje {i}", i % 2 == 0, now)
+        for i in range(args.messages)
+    ]
+    legacy_message, message = legacy_messages[0], messages[0]
+
+    print("=" * 78)
+    print(f"⏱  Esquemas de models.py ({type(provider).__name__})")
+    print("=" * 78)
+    print(f"{'operación':<44} {'antes (op/s)':>15} {'ahora (op/s)':>15}")
+    for name, legacy, current in decoders:
+        print(
+            f"{'decodificar + validar ' + name:<44} "
+            f"{ops_per_second(legacy, args.number):>15,.0f} "
+            f"{ops_per_second(current, args.number):>15,.0f}"
+        )
+    print(
+        f"{'ChatMessage.to_dict':<44} "
+        f"{ops_per_second(legacy_message.to_dict, args.number):>15,.0f} "
+        f"{ops_per_second(message.to_dict, args.number):>15,.0f}"
+    )
+    number = max(1, args.number // args.messages)
+    legacy_json = ops_per_second(
+        lambda: dumps([m.to_dict() for m in legacy_messages]), number
+    )
+    encoders = [
+        ("to_dict + JSON", lambda: dumps([m.to_dict() for m in messages])),
+        # Sin to_dict: el proveedor llama a `default` con cada modelo
+        ("modelos directos al proveedor", lambda: dumps(messages)),
+    ]
+    for name, encode in encoders:
+        label = f"{args.messages:,} mensajes: {name}"
+        print(
+            f"{label:<44} {legacy_json:>15,.1f} "
+            f"{ops_per_second(encode, number):>15,.1f}"
+        )
+
+    legacy_size = allocated(
+        lambda i: LegacyChatMessage("uid", "hola", True, now), args.number
+    )
+    size = allocated(lambda i: ChatMessage("uid", "hola", True, now), args.number)
+    print(f"{'bytes por ChatMessage':<44} {legacy_size:>15,.0f} {size:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del chat servido con gunicorn: compara el worker síncrono por
+defecto (`gunicorn app:app`) con la configuración gthread de gunicorn.conf.py.
+Usa Firestore en memoria y un Gemini falso con latencia fija; mientras los
+chats esperan al modelo, mide también la latencia de GET /api/notes.
+
+    python bench_serving.py
+    python bench_serving.py --concurrency 300 --duration 20 --gemini-latency 2
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODES = {
+    # Lo que se obtiene con `gunicorn app:app`: un proceso, un hilo
+    "sync": None,
+    "gthread": os.path.join(HERE, "gunicorn.conf.py"),
+}
+
+
+def create_app():
+    """Fábrica para gunicorn: la app con los dobles de bench_endpoints"""
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import bench_endpoints
+
+    bench_endpoints.install_fakes(float(os.environ["BENCH_GEMINI_LATENCY"]))
+    return bench_endpoints.backend.app
+
+
+def start_server(mode, port, workers, gemini_latency):
+    env = dict(
+        os.environ, BENCH_GEMINI_LATENCY=str(gemini_latency), WARMUP_ON_START="false"
+    )
+    env.setdefault("LOG_LEVEL", "WARNING")
+    config = MODES[mode]
+    if config is None:
+        # Sin --config, gunicorn cargaría el gunicorn.conf.py de este directorio
+        config = os.path.join(tempfile.mkdtemp(prefix="zenith-bench-"), "sync.py")
+        open(config, "w").close()
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        "--config",
+        config,
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        "bench_serving:create_app()",
+    ]
+    server = subprocess.Popen(command, cwd=HERE, env=env)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if request(port, "GET", "/api/health", timeout=1)[0] == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn ({mode}) no arrancó")
+
+
+def request(port, method, path, body=None, timeout=60):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        headers = {"Authorization": "Bearer bench-user"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(body)
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status, response
+    finally:
+        conn.close()
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[max(0, math.ceil(fraction * len(samples)) - 1)]
+
+
+def run_load(port, concurrency, duration):
+    """`concurrency` clientes mandando chats en bucle durante `duration` segundos"""
+    stop_at = time.monotonic() + duration
+    stopped = threading.Event()
+    notes_samples = []
+
+    def chat_client(_):
+        samples, errors = [], 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                status, _ = request(
+                    port, "POST", "/api/chat/send", {"message": "Hola"}, duration
+                )
+            except OSError:
+                status = 0
+            if time.monotonic() > stop_at:
+                # Las peticiones que terminan fuera de la ventana no cuentan
+                break
+            samples.append(time.perf_counter() - start)
+            errors += status != 200
+        return samples, errors
+
+    def notes_probe():
+        while not stopped.is_set():
+            start = time.perf_counter()
+            try:
+                request(port, "GET", "/api/notes", timeout=duration)
+                notes_samples.append(time.perf_counter() - start)
+            except OSError:
+                notes_samples.append(duration)
+            stopped.wait(0.2)
+
+    probe = threading.Thread(target=notes_probe, daemon=True)
+    probe.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(chat_client, range(concurrency)))
+    stopped.set()
+    probe.join(duration)
+
+    samples = [sample for result, _ in results for sample in result]
+    return {
+        "chats": len(samples),
+        "errors": sum(errors for _, errors in results),
+        "rps": len(samples) / duration,
+        "p50": percentile(samples, 0.5),
+        "p99": percentile(samples, 0.99),
+        "notes_p50": percentile(notes_samples, 0.5),
+        "notes_p99": percentile(notes_samples, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--gemini-latency", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=5057)
+    args = parser.parse_args()
+
+    print("=" * 96)
+    print(
+        "⏱  Prueba de carga del chat con gunicorn (Firestore en memoria, Gemini falso)"
+    )
+    print(
+        f"   {args.concurrency} clientes durante {args.duration:.0f} s, "
+        f"{args.workers} proceso(s), latencia de Gemini {args.gemini_latency * 1000:.0f} ms"
+    )
+    print("=" * 96)
+    print(
+        f"{'modo':<8} {'chats':>7} {'chats/s':>8} {'errores':>8} {'p50 (s)':>8} "
+        f"{'p99 (s)':>8} {'notas p50 (ms)':>15} {'notas p99 (ms)':>15}"
+    )
+
+    for mode in args.modes:
+        server = start_server(mode, args.port, args.workers, args.gemini_latency)
+        try:
+            result = run_load(args.port, args.concurrency, args.duration)
+        finally:
+            server.terminate()
+            server.wait(30)
+        print(
+            f"{mode:<8} {result['chats']:>7} {result['rps']:>8.1f} "
+            f"{result['errors']:>8} {result['p50']:>8.2f} {result['p99']:>8.2f} "
+            f"{result['notes_p50'] * 1000:>15.1f} {result['notes_p99'] * 1000:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
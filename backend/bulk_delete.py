@@ -0,0 +1,93 @@
+"""
+Borrado masivo de documentos de Firestore con escrituras por lotes
+"""
+import contextvars
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_BATCH_SIZE = 500
+
+
+def delete_in_batches(
+    db,
+    query,
+    batch_size=MAX_BATCH_SIZE,
+    max_in_flight=4,
+    max_docs=None,
+    progress=None,
+):
+    """
+    Borra los documentos de la consulta en lotes de hasta 500, con un máximo
+    de lotes en vuelo a la vez. Devuelve el número de documentos borrados.
+    """
+    batch_size = min(batch_size, MAX_BATCH_SIZE)
+    slots = threading.BoundedSemaphore(max_in_flight)
+    futures = []
+    deleted = 0
+    last_doc = None
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        while max_docs is None or deleted < max_docs:
+            limit = batch_size
+            if max_docs is not None:
+                limit = min(batch_size, max_docs - deleted)
+            # Solo se piden las referencias, no el contenido de los documentos
+            page_query = query.select([]).limit(limit)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+
+            docs = list(page_query.stream())
+            if not docs:
+                break
+
+            batch = db.batch()
+            for doc in docs:
+                batch.delete(doc.reference)
+
+            slots.acquire()
+            future = executor.submit(contextvars.copy_context().run, batch.commit)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+
+            deleted += len(docs)
+            last_doc = docs[-1]
+            if progress:
+                progress(deleted)
+            if len(docs) < limit:
+                break
+
+        for future in futures:
+            future.result()
+
+    return deleted
+
+
+class DeleteJob:
+    def __init__(self, owner):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.status = "running"
+        self.deleted = 0
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def update(self, deleted):
+        self.deleted = deleted
+
+    def finish(self, error=None):
+        self.status = "error" if error else "done"
+        self.error = error
+        self.finished_at = time.time()
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "deleted": self.deleted,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
@@ -0,0 +1,118 @@
+"""
+Archivo de historiales de chat largos: los mensajes antiguos se agrupan en
+documentos con una lista ordenada de mensajes comprimida con zlib, y los
+originales se borran en la misma escritura por lotes
+"""
+import json
+import zlib
+from datetime import datetime, timedelta, timezone
+
+try:
+    from timestamps import from_micros, to_micros
+except ImportError:
+    from backend.timestamps import from_micros, to_micros
+
+# Un lote de Firestore admite 500 escrituras: el archivo y hasta 499 borrados
+MAX_CHUNK_SIZE = 499
+# Muy por debajo del máximo de 1 MiB de un documento de Firestore
+MAX_CHUNK_BYTES = 512 * 1024
+# Coste aproximado de cada mensaje en el JSON, además del texto
+MESSAGE_OVERHEAD = 32
+
+
+def pack(messages):
+    """[[microsegundos, es_del_usuario, texto], ...] en JSON comprimido"""
+    rows = [
+        [to_micros(msg["timestamp"]), bool(msg["is_user_message"]), msg["text"]]
+        for msg in messages
+    ]
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(payload.encode("utf-8"))
+
+
+def unpack(user_id, data):
+    """Mensajes del archivo, del más antiguo al más reciente"""
+    return [
+        {
+            "user_id": user_id,
+            "text": text,
+            "is_user_message": is_user_message,
+            "timestamp": from_micros(micros),
+        }
+        for micros, is_user_message, text in json.loads(zlib.decompress(data))
+    ]
+
+
+def message_size(message):
+    return len(message["text"].encode("utf-8")) + MESSAGE_OVERHEAD
+
+
+def archive_cutoff(chat, user_id, now, max_age_days, keep, min_live):
+    """
+    Los mensajes anteriores al valor devuelto se archivan: los que superan
+    los `keep` más recientes o tienen más de `max_age_days`, pero nunca los
+    `min_live` más recientes (la ventana del chat). None si no hay nada.
+    """
+    newest_kept = chat.timestamp_at(user_id, min_live - 1)
+    if newest_kept is None:
+        return None
+    cutoff = now - timedelta(days=max_age_days)
+    over_count = chat.timestamp_at(user_id, keep - 1)
+    if over_count is not None:
+        cutoff = max(cutoff, over_count)
+    return min(cutoff, newest_kept)
+
+
+def compact(chat, user_id, cutoff, chunk_size=MAX_CHUNK_SIZE):
+    """
+    Mueve al archivo los mensajes anteriores a `cutoff`, del más antiguo al
+    más reciente. El último archivo se completa antes de empezar otro. Cada
+    escritura guarda un archivo y borra sus mensajes de forma atómica.
+    Devuelve (mensajes archivados, documentos de archivo escritos).
+    """
+    chunk_size = min(chunk_size, MAX_CHUNK_SIZE)
+    archive_id, current = chat.newest_archive(user_id) or (None, [])
+    size = sum(message_size(msg) for msg in current)
+    if len(current) >= chunk_size or size >= MAX_CHUNK_BYTES:
+        archive_id, current, size = None, [], 0
+
+    archived = written = 0
+    while True:
+        room = chunk_size - len(current)
+        rows = chat.oldest_before(user_id, cutoff, room)
+        if not rows:
+            break
+
+        taken = []
+        for message_id, msg in rows:
+            if current and size + message_size(msg) > MAX_CHUNK_BYTES:
+                break
+            taken.append(message_id)
+            current.append(msg)
+            size += message_size(msg)
+
+        if taken:
+            chat.write_archive(user_id, archive_id, current, taken)
+            archived += len(taken)
+            written += 1
+            if len(rows) < room and len(taken) == len(rows):
+                break
+        # Archivo lleno (por número o por tamaño): el resto va a uno nuevo
+        archive_id, current, size = None, [], 0
+
+    return archived, written
+
+
+def compact_user(chat, user_id, config, now=None):
+    now = now or datetime.now(timezone.utc)
+    cutoff = archive_cutoff(
+        chat,
+        user_id,
+        now,
+        config["CHAT_ARCHIVE_AFTER_DAYS"],
+        config["CHAT_ARCHIVE_KEEP"],
+        config["CHAT_WINDOW_SIZE"],
+    )
+    if cutoff is None:
+        return 0, 0
+    return compact(chat, user_id, cutoff, config["CHAT_ARCHIVE_CHUNK"])
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Script para archivar los mensajes antiguos del chat: los que superan los
+CHAT_ARCHIVE_KEEP más recientes de cada usuario o tienen más de
+CHAT_ARCHIVE_AFTER_DAYS días se agrupan en documentos comprimidos de
+`conversaciones/{uid}/archivo`. El historial los sigue mostrando.
+
+Pensado para ejecutarse periódicamente (cron, Cloud Scheduler):
+
+Uso:
+    python compact_chats.py             # todas las conversaciones
+    python compact_chats.py UID1 UID2   # solo las indicadas
+"""
+import sys
+import time
+
+from chat_archive import compact_user
+from config import Config
+from services import Services
+
+
+def main(user_ids):
+    config = {key: value for key, value in vars(Config).items() if key.isupper()}
+    storage = Services(config).storage.get()
+    if storage is None:
+        print("❌ Almacenamiento no configurado (revisa FIREBASE_CREDENTIALS)")
+        return 1
+
+    if not user_ids:
+        print("🔎 Buscando conversaciones...")
+        user_ids = storage.chat.user_ids()
+
+    print("=" * 60)
+    print(f"🗄  Archivando mensajes de {len(user_ids)} conversación(es)")
+    print("=" * 60)
+
+    failed = total = 0
+    start = time.perf_counter()
+    for user_id in user_ids:
+        try:
+            archived, written = compact_user(storage.chat, user_id, config)
+            total += archived
+            if archived:
+                print(f"✓ {user_id}: {archived} mensajes en {written} archivo(s)")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {user_id}: {str(e)}")
+
+    print("=" * 60)
+    print(f"{total} mensajes archivados en {time.perf_counter() - start:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
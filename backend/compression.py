@@ -0,0 +1,84 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding
+"""
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+
+# Lo estático se comprime una vez con el máximo nivel; lo dinámico en cada
+# respuesta, con niveles que comprimen casi igual por una fracción del tiempo
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+
+
+def compress(body, encoding, level=None):
+    if encoding == "br":
+        return brotli.compress(body, quality=level or STATIC_LEVELS["br"])
+    if encoding == "gzip":
+        # mtime=0 para que la salida (y su ETag) sea determinista
+        return gzip.compress(
+            body, compresslevel=level or STATIC_LEVELS["gzip"], mtime=0
+        )
+    return body
+
+
+def compress_stream(chunks, encoding, level=None):
+    """
+    Comprime un cuerpo en streaming. Cada fragmento se vacía al salir
+    (sync flush) para que el cliente lo reciba sin esperar al siguiente.
+    """
+    level = level or DYNAMIC_LEVELS[encoding]
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+
+    # wbits=31: formato gzip (cabecera y CRC) en lugar de zlib
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def best_encoding(request, available):
+    """Elige la mejor codificación aceptada por el cliente o 'identity'"""
+    return request.accept_encodings.best_match(available, default="identity")
+
+
+def compress_response(request, response, min_size):
+    """
+    Comprime en after_request las respuestas JSON de al menos min_size bytes.
+    Un ETag fuerte pasa a débil: el cuerpo cambia según la codificación, pero
+    las peticiones condicionales (comparación débil) siguen funcionando.
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code != 200
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    encoding = best_encoding(request, ENCODINGS)
+    if encoding == "identity":
+        return response
+
+    response.set_data(compress(body, encoding, DYNAMIC_LEVELS[encoding]))
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
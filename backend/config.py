@@ -8,3 +8,94 @@ class Config:
     FIREBASE_CREDENTIALS = os.getenv('FIREBASE_CREDENTIALS')
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5713').split(',')
+
+    # Caché de tokens de Firebase verificados
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', '1024'))
+    TOKEN_CACHE_MAX_TTL = int(os.getenv('TOKEN_CACHE_MAX_TTL', '300'))
+    TOKEN_CHECK_REVOKED = os.getenv('TOKEN_CHECK_REVOKED', 'false').lower() == 'true'
+
+    # Pools de hilos para E/S de Firestore
+    IO_WORKERS = int(os.getenv('IO_WORKERS', '8'))
+    BACKGROUND_WORKERS = int(os.getenv('BACKGROUND_WORKERS', '4'))
+    BACKGROUND_MAX_PENDING = int(os.getenv('BACKGROUND_MAX_PENDING', '256'))
+    BACKGROUND_FLUSH_TIMEOUT = int(os.getenv('BACKGROUND_FLUSH_TIMEOUT', '10'))
+
+    # Ventana de conversación en memoria por usuario
+    CHAT_WINDOW_SIZE = int(os.getenv('CHAT_WINDOW_SIZE', '20'))
+    CHAT_CACHE_USERS = int(os.getenv('CHAT_CACHE_USERS', '1000'))
+    CHAT_CACHE_TTL = int(os.getenv('CHAT_CACHE_TTL', '300'))
+
+    # Prompt del chat
+    PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1500'))
+    PROMPT_MAX_MESSAGES = int(os.getenv('PROMPT_MAX_MESSAGES', '10'))
+    SUMMARY_MAX_TOKENS = int(os.getenv('SUMMARY_MAX_TOKENS', '200'))
+    SUMMARY_MIN_PENDING = int(os.getenv('SUMMARY_MIN_PENDING', '10'))
+
+    # Tamaño máximo de página del historial del chat
+    CHAT_HISTORY_MAX_PAGE = int(os.getenv('CHAT_HISTORY_MAX_PAGE', '100'))
+
+    # Borrado del historial del chat
+    CHAT_CLEAR_SYNC_LIMIT = int(os.getenv('CHAT_CLEAR_SYNC_LIMIT', '2000'))
+    DELETE_MAX_IN_FLIGHT = int(os.getenv('DELETE_MAX_IN_FLIGHT', '4'))
+
+    # Archivo del chat (compact_chats.py): mensajes vivos máximos, antigüedad y mensajes por archivo
+    CHAT_ARCHIVE_KEEP = int(os.getenv('CHAT_ARCHIVE_KEEP', '500'))
+    CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv('CHAT_ARCHIVE_AFTER_DAYS', '30'))
+    CHAT_ARCHIVE_CHUNK = int(os.getenv('CHAT_ARCHIVE_CHUNK', '400'))
+
+    # Tamaño máximo de página del listado de notas
+    NOTES_MAX_PAGE = int(os.getenv('NOTES_MAX_PAGE', '100'))
+
+    # Sincronización incremental: cambios por respuesta y días que se guardan las notas borradas
+    NOTES_SYNC_MAX_PAGE = int(os.getenv('NOTES_SYNC_MAX_PAGE', '500'))
+    NOTES_TOMBSTONE_DAYS = int(os.getenv('NOTES_TOMBSTONE_DAYS', '90'))
+
+    # Segundos que se reutiliza el directorio de psicólogos sin leer Firestore
+    PSYCHOLOGISTS_CACHE_TTL = int(os.getenv('PSYCHOLOGISTS_CACHE_TTL', '600'))
+
+    # Segundos que los clientes pueden guardar los catálogos (emociones, consejos)
+    CATALOG_MAX_AGE = int(os.getenv('CATALOG_MAX_AGE', '86400'))
+
+    # Inicializa Firebase y Gemini en segundo plano al arrancar en vez de en la primera petición
+    WARMUP_ON_START = os.getenv('WARMUP_ON_START', 'false').lower() == 'true'
+
+    # Logs estructurados: nivel mínimo y fracción de eventos frecuentes que se escriben
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+    # Si se define, /api/metrics exige "Authorization: Bearer <METRICS_TOKEN>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+    # Llamadas a Gemini: simultáneas, cola de espera, plazo por llamada y reintentos
+    GEMINI_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', '8'))
+    GEMINI_MAX_QUEUE = int(os.getenv('GEMINI_MAX_QUEUE', '32'))
+    GEMINI_QUEUE_TIMEOUT = float(os.getenv('GEMINI_QUEUE_TIMEOUT', '5'))
+    GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '30'))
+    GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '2'))
+
+    # Circuit breaker: fallos seguidos que lo abren y segundos que permanece abierto
+    GEMINI_BREAKER_THRESHOLD = int(os.getenv('GEMINI_BREAKER_THRESHOLD', '5'))
+    GEMINI_BREAKER_COOLDOWN = float(os.getenv('GEMINI_BREAKER_COOLDOWN', '30'))
+
+    # Respuestas guardadas por Idempotency-Key en /api/chat/send y POST /api/notes
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '2048'))
+    IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', '3600'))
+
+    # Tamaño máximo del cuerpo de una petición (Flask responde 413)
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(256 * 1024)))
+
+    # Subpeticiones GET admitidas en cada POST /api/batch
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', '20'))
+
+    # Registros leídos por consulta en /api/export y si se comprime la descarga
+    EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', '500'))
+    EXPORT_COMPRESS = os.getenv('EXPORT_COMPRESS', 'true').lower() == 'true'
+
+    # Serialización JSON ("orjson" o "default") y compresión de respuestas grandes
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson').lower()
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+
+    # Dónde se guardan notas, chats y psicólogos: "firestore" o "sqlite" (autoalojado)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'firestore').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'data/zenith.db')
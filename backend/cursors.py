@@ -0,0 +1,59 @@
+"""
+Cursores opacos para paginar consultas ordenadas por timestamp (o por
+(timestamp, id) si hay empates) y tokens de sincronización (updated_at, id)
+para pedir solo lo que cambió
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp, document_id=None):
+    """Cursor de página; con document_id desempata los timestamps iguales"""
+    payload = {"ts": timestamp.isoformat()}
+    if document_id is not None:
+        payload["id"] = document_id
+    payload = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_keyed_cursor(cursor):
+    """
+    Devuelve (timestamp, id) guardados en el cursor, con id None si no lo
+    lleva, o lanza ValueError
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = datetime.fromisoformat(payload["ts"])
+        # Sin zona no se puede comparar con los timestamps guardados (UTC)
+        if timestamp.tzinfo is None:
+            raise ValueError("Naive timestamp")
+        document_id = payload.get("id")
+        return timestamp, None if document_id is None else str(document_id)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def decode_cursor(cursor):
+    """Devuelve el timestamp guardado en el cursor o lanza ValueError"""
+    return decode_keyed_cursor(cursor)[0]
+
+
+def encode_sync_token(updated_at, document_id):
+    payload = {"ts": updated_at.isoformat(), "id": document_id}
+    payload = json.dumps(payload).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_sync_token(token):
+    """Devuelve (updated_at, id) guardados en el token o lanza ValueError"""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        updated_at = datetime.fromisoformat(payload["ts"])
+        if updated_at.tzinfo is None:
+            raise ValueError("Naive timestamp")
+        return updated_at, str(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid sync token") from e
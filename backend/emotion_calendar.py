@@ -0,0 +1,234 @@
+"""
+Calendario de emociones materializado: un documento por usuario y mes en
+calendario/{email}/meses/{YYYY-MM}, con el emoji de la última nota de cada día
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+MAX_MONTHS = 36
+
+
+def day_key(timestamp):
+    return timestamp.strftime("%Y-%m-%d")
+
+
+def month_key(timestamp):
+    return timestamp.strftime("%Y-%m")
+
+
+def calendar_ref(db, email):
+    return db.collection("calendario").document(email)
+
+
+def month_ref(db, email, month):
+    return calendar_ref(db, email).collection("meses").document(month)
+
+
+def parse_month(value):
+    """Valida un mes con formato YYYY-MM y lanza ValueError si no lo es"""
+    if not MONTH_RE.match(value or ""):
+        raise ValueError(f"Invalid month: {value}")
+    return value
+
+
+def months_between(start, end):
+    year, month = map(int, start.split("-"))
+    end_year, end_month = map(int, end.split("-"))
+    span = (end_year - year) * 12 + end_month - month + 1
+    if span < 1 or span > MAX_MONTHS:
+        raise ValueError(f"Month range must cover 1 to {MAX_MONTHS} months")
+
+    months = []
+    for _ in range(span):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def create_note_with_calendar(db, note_data):
+    """
+    Crea la nota y marca su día en el calendario en una sola escritura atómica.
+    El timestamp de la nota y el día del calendario salen del mismo instante:
+    con SERVER_TIMESTAMP, cerca de medianoche podrían caer en días distintos.
+    """
+    now = datetime.now(timezone.utc)
+    note_data = dict(note_data, timestamp=now)
+    note_ref = db.collection("notas").document()
+
+    batch = db.batch()
+    batch.set(note_ref, note_data)
+    batch.set(
+        month_ref(db, note_data["email"], month_key(now)),
+        {
+            "dias": {
+                day_key(now): {
+                    "emoji": note_data.get("emotion_emoji", ""),
+                    "note_id": note_ref.id,
+                }
+            }
+        },
+        merge=True,
+    )
+    batch.commit()
+    return note_ref.id
+
+
+def tombstone_ref(db, note_id):
+    return db.collection("notas_borradas").document(note_id)
+
+
+def delete_note_with_calendar(db, note_ref, note_data, tombstone=None):
+    """
+    Borra la nota y recalcula su día en el calendario dentro de una transacción.
+    Si se pasa `tombstone`, deja constancia del borrado en notas_borradas.
+    """
+    from firebase_admin import firestore
+
+    def delete_note(writer):
+        writer.delete(note_ref)
+        if tombstone is not None:
+            writer.set(tombstone_ref(db, note_ref.id), tombstone)
+
+    timestamp = note_data.get("timestamp")
+    if not timestamp:
+        batch = db.batch()
+        delete_note(batch)
+        batch.commit()
+        return
+
+    email = note_data["email"]
+    day = day_key(timestamp)
+    day_start = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    month_doc = month_ref(db, email, month_key(timestamp))
+
+    @firestore.transactional
+    def run(transaction):
+        month_snapshot = month_doc.get(transaction=transaction)
+        days = {}
+        if month_snapshot.exists:
+            days = month_snapshot.to_dict().get("dias") or {}
+
+        # Solo hay que recalcular si la nota borrada era la que se mostraba
+        if days.get(day, {}).get("note_id") != note_ref.id:
+            delete_note(transaction)
+            return
+
+        candidates = (
+            db.collection("notas")
+            .where("email", "==", email)
+            .where("timestamp", ">=", day_start)
+            .where("timestamp", "<", day_start + timedelta(days=1))
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+            .limit(2)
+            .stream(transaction=transaction)
+        )
+        latest = next((note for note in candidates if note.id != note_ref.id), None)
+
+        delete_note(transaction)
+        if latest:
+            entry = {
+                "emoji": latest.to_dict().get("emotion_emoji", ""),
+                "note_id": latest.id,
+            }
+        else:
+            entry = firestore.DELETE_FIELD
+        transaction.set(month_doc, {"dias": {day: entry}}, merge=True)
+
+    run(db.transaction())
+
+
+def read_calendar(db, email, start=None, end=None):
+    """
+    Devuelve {fecha: emoji} leyendo solo los documentos de los meses pedidos,
+    o None si el calendario del usuario aún no se ha generado.
+    """
+    parent = calendar_ref(db, email)
+    if start and end:
+        refs = [month_ref(db, email, month) for month in months_between(start, end)]
+        snapshots = {
+            snapshot.reference.path: snapshot
+            for snapshot in db.get_all([parent] + refs)
+        }
+        if not snapshots[parent.path].exists:
+            return None
+        months = [snapshots[ref.path] for ref in refs]
+    else:
+        if not parent.get().exists:
+            return None
+        months = parent.collection("meses").stream()
+
+    emotions_by_day = {}
+    for snapshot in months:
+        if not snapshot.exists:
+            continue
+        for day, entry in (snapshot.to_dict().get("dias") or {}).items():
+            emotions_by_day[day] = entry.get("emoji", "")
+    return emotions_by_day
+
+
+def merge_month(db, email, month, days, seen_ids):
+    """
+    Escribe en una transacción los días recalculados de un mes. Las entradas
+    del documento que apuntan a notas que la reconstrucción no leyó se
+    conservan si la nota existe (creada mientras tanto) y se descartan si no
+    (borrada). Un mes que se queda vacío se elimina.
+    """
+    from firebase_admin import firestore
+
+    doc = month_ref(db, email, month)
+
+    @firestore.transactional
+    def run(transaction):
+        snapshot = doc.get(transaction=transaction)
+        existing = (snapshot.to_dict().get("dias") or {}) if snapshot.exists else {}
+        merged = dict(days)
+        for day, entry in existing.items():
+            note_id = entry.get("note_id")
+            if not note_id or note_id in seen_ids:
+                continue
+            note = db.collection("notas").document(note_id)
+            if note.get(transaction=transaction).exists:
+                merged[day] = entry
+        if merged:
+            transaction.set(doc, {"dias": merged})
+        elif snapshot.exists:
+            transaction.delete(doc)
+
+    run(db.transaction())
+
+
+def backfill_calendar(db, email):
+    """
+    Reconstruye todos los meses del usuario a partir de sus notas. Cada mes
+    se escribe en su propia transacción, así que las notas creadas o borradas
+    durante la reconstrucción no se pierden.
+    """
+    from firebase_admin import firestore
+
+    latest_by_day = {}
+    seen_ids = set()
+    for note in db.collection("notas").where("email", "==", email).stream():
+        seen_ids.add(note.id)
+        note_data = note.to_dict()
+        timestamp = note_data.get("timestamp")
+        if not timestamp or "emotion_emoji" not in note_data:
+            continue
+        day = day_key(timestamp)
+        current = latest_by_day.get(day)
+        if current is None or timestamp >= current[0]:
+            latest_by_day[day] = (timestamp, note.id, note_data["emotion_emoji"])
+
+    months = {}
+    for day, (timestamp, note_id, emoji) in latest_by_day.items():
+        months.setdefault(day[:7], {})[day] = {"emoji": emoji, "note_id": note_id}
+
+    # Los meses que ya no tienen notas también pasan por la transacción
+    for existing in calendar_ref(db, email).collection("meses").stream():
+        months.setdefault(existing.id, {})
+
+    for month, days in months.items():
+        merge_month(db, email, month, days, seen_ids)
+    calendar_ref(db, email).set({"backfilled_at": firestore.SERVER_TIMESTAMP})
+
+    return {day: entry[2] for day, entry in latest_by_day.items()}
@@ -0,0 +1,97 @@
+"""
+GET /api/export: todas las notas y la conversación de un usuario en NDJSON o
+CSV, generadas página a página para que la memoria no dependa del tamaño del
+historial
+"""
+
+import csv
+import io
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+SECTIONS = ("notes", "chat")
+
+# Columnas de notas y de mensajes; cada fila rellena solo las de su tipo
+CSV_COLUMNS = (
+    "type",
+    "id",
+    "timestamp",
+    "title",
+    "content",
+    "emotion_name",
+    "emotion_emoji",
+    "is_user_message",
+    "text",
+)
+# Una hoja de cálculo interpreta como fórmula las celdas que empiezan así
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def parse_sections(value):
+    """Secciones pedidas en `include` ("notes,chat" por defecto), en orden fijo"""
+    if not value:
+        return list(SECTIONS)
+    sections = {section.strip() for section in value.split(",") if section.strip()}
+    if not sections or sections - set(SECTIONS):
+        raise ValueError(f"'include' must be a list of: {', '.join(SECTIONS)}")
+    return [section for section in SECTIONS if section in sections]
+
+
+def iter_records(storage, user, sections, page_size):
+    """Páginas de (tipo, registros), cada una leída al pedirla"""
+    if "notes" in sections:
+        for page in storage.notes.iter_pages(user["email"], page_size):
+            yield "note", page
+    if "chat" in sections:
+        for page in storage.chat.iter_pages(user["uid"], page_size):
+            yield "message", page
+
+
+def line_encoder(provider):
+    """JSON en bytes y en una sola línea con el proveedor de la app"""
+    dumps_bytes = getattr(provider, "dumps_bytes", None)
+    if dumps_bytes is not None:
+        return dumps_bytes
+    # Con el proveedor de Flask en modo debug la salida iría indentada
+    return lambda obj: provider.dumps(obj, indent=None, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def ndjson_chunks(pages, dumps, header):
+    """La cabecera de la exportación y después una línea por registro"""
+    yield dumps({"type": "export", **header}) + b"\n"
+    for kind, records in pages:
+        yield b"".join(dumps({"type": kind, **record}) + b"\n" for record in records)
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    value = str(value)
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+
+def _drain(buffer):
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def csv_chunks(pages):
+    """Una fila por registro; el BOM hace que Excel lea bien los acentos"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(CSV_COLUMNS)
+    yield _drain(buffer)
+    for kind, records in pages:
+        for record in records:
+            writer.writerow(
+                [kind] + [_cell(record.get(column)) for column in CSV_COLUMNS[1:]]
+            )
+        yield _drain(buffer)
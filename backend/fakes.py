@@ -0,0 +1,486 @@
+"""
+Dobles en memoria para medir el backend sin servicios reales: el subconjunto
+del cliente de Firestore que usa la app, un modelo de Gemini con latencia
+configurable y un verify_token que acepta cualquier token
+"""
+import bisect
+import functools
+import itertools
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from google.cloud.firestore_v1 import transforms
+
+DESCENDING = "DESCENDING"
+QUERY_CACHE_SIZE = 256
+# Ruta de campo con la que Firestore ordena por id de documento
+NAME = "__name__"
+
+
+def _copy(value):
+    # Más rápido que deepcopy para los documentos planos que guarda la app
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _resolve(data, now):
+    resolved = {}
+    for key, value in data.items():
+        if value is transforms.SERVER_TIMESTAMP:
+            value = now
+        elif isinstance(value, dict):
+            value = _resolve(value, now)
+        resolved[key] = value
+    return resolved
+
+
+def _merge(target, data):
+    for key, value in data.items():
+        if value is transforms.DELETE_FIELD:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        elif isinstance(value, dict):
+            target[key] = {}
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+def _compare(a, b):
+    return (a > b) - (a < b)
+
+
+OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "in": lambda a, b: a in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data, fields=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+        self._fields = fields
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        if self._fields is not None:
+            return {
+                field: _copy(self._data[field])
+                for field in self._fields
+                if field in self._data
+            }
+        return _copy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeDocument:
+    def __init__(self, client, path):
+        self._client = client
+        self.path = path
+        self._parent, self.id = path.rsplit("/", 1)
+
+    def collection(self, name):
+        return FakeCollection(self._client, f"{self.path}/{name}")
+
+    def get(self, transaction=None, field_paths=None):
+        self._client._round_trip()
+        with self._client._lock:
+            data = self._client._collections.get(self._parent, {}).get(self.id)
+        return FakeSnapshot(self, data, field_paths)
+
+    def set(self, data, merge=False):
+        self._client._write([("set", self, data, merge)])
+
+    def create(self, data):
+        self._client._write([("create", self, data, False)])
+
+    def update(self, data):
+        self._client._write([("update", self, data, True)])
+
+    def delete(self):
+        self._client._write([("delete", self, None, False)])
+
+
+class FakeQuery:
+    def __init__(self, client, path, filters=(), orders=(), limit=None, cursor=None):
+        self._client = client
+        self._path = path
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._cursor = cursor
+        self._inclusive = False
+        self._fields = None
+
+    def _copy_with(self, **changes):
+        query = FakeQuery(
+            self._client,
+            self._path,
+            changes.get("filters", self._filters),
+            changes.get("orders", self._orders),
+            changes.get("limit", self._limit),
+            changes.get("cursor", self._cursor),
+        )
+        query._fields = changes.get("fields", self._fields)
+        query._inclusive = changes.get("inclusive", self._inclusive)
+        return query
+
+    def where(self, field, op, value):
+        return self._copy_with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy_with(orders=self._orders + ((field, direction),))
+
+    def limit(self, count):
+        return self._copy_with(limit=count)
+
+    def start_after(self, document_fields):
+        return self._copy_with(cursor=document_fields, inclusive=False)
+
+    def start_at(self, document_fields):
+        return self._copy_with(cursor=document_fields, inclusive=True)
+
+    def select(self, field_paths):
+        return self._copy_with(fields=list(field_paths))
+
+    def _directions(self):
+        directions = [direction for _, direction in self._orders]
+        # El id del documento desempata con la dirección del último orden
+        return directions + [directions[-1] if directions else "ASCENDING"]
+
+    def _key(self, document_id, data):
+        return tuple(
+            document_id if field == NAME else data.get(field)
+            for field, _ in self._orders
+        ) + (document_id,)
+
+    def _cmp(self, a, b):
+        for left, right, direction in zip(a, b, self._directions()):
+            result = _compare(left, right)
+            if result:
+                return -result if direction == DESCENDING else result
+        return 0
+
+    def _cursor_key(self):
+        if isinstance(self._cursor, FakeSnapshot):
+            return self._key(self._cursor.id, self._cursor._data or {})
+        # Como en Firestore, el cursor puede cubrir solo los primeros órdenes
+        fields = [field for field, _ in self._orders][: len(self._cursor)]
+        return tuple(
+            getattr(self._cursor[field], "id", self._cursor[field]) for field in fields
+        )
+
+    def _matches(self, data, filters):
+        return all(
+            field in data and OPERATORS[op](data[field], value)
+            for field, op, value in filters
+        ) and all(field == NAME or field in data for field, _ in self._orders)
+
+    def _rows(self):
+        equality = next((f for f in self._filters if f[1] == "=="), None)
+        filters = [f for f in self._filters if f is not equality]
+        documents = self._client._collections.get(self._path, {})
+        if equality:
+            # Como Firestore, solo se recorren los documentos del índice
+            ids = self._client._index(self._path, equality[0]).get(equality[2], ())
+            candidates = ((document_id, documents[document_id]) for document_id in ids)
+        else:
+            candidates = documents.items()
+        if not filters and not self._orders:
+            return [
+                ((document_id,), document_id, data) for document_id, data in candidates
+            ]
+        return [
+            (self._key(document_id, data), document_id, data)
+            for document_id, data in candidates
+            if self._matches(data, filters)
+        ]
+
+    def _sorted_rows(self):
+        """
+        Filas en orden ascendente. Como un índice de Firestore, se reutilizan
+        mientras la colección no cambie, así que paginar no reordena todo.
+        """
+        client = self._client
+        cache_key = (self._path, self._filters, self._orders)
+        with client._lock:
+            version = client._versions.get(self._path, 0)
+            cached = client._query_cache.get(cache_key)
+            if cached and cached[0] == version:
+                return cached[1]
+            rows = self._rows()
+
+        rows.sort(key=lambda row: row[0])
+        with client._lock:
+            if len(client._query_cache) >= QUERY_CACHE_SIZE:
+                client._query_cache.clear()
+            client._query_cache[cache_key] = (version, rows)
+        return rows
+
+    def _page(self, rows, descending):
+        start, end = 0, len(rows)
+        if self._cursor is not None:
+            cursor = self._cursor_key()
+            size = len(cursor)
+            # start_at incluye las filas iguales al cursor; start_after no
+            if descending:
+                edge = bisect.bisect_right if self._inclusive else bisect.bisect_left
+                end = edge(rows, cursor, key=lambda row: row[0][:size])
+            else:
+                edge = bisect.bisect_left if self._inclusive else bisect.bisect_right
+                start = edge(rows, cursor, key=lambda row: row[0][:size])
+        if descending:
+            if self._limit is not None:
+                start = max(start, end - self._limit)
+            return rows[start:end][::-1]
+        if self._limit is not None:
+            end = min(end, start + self._limit)
+        return rows[start:end]
+
+    def stream(self, transaction=None):
+        self._client._round_trip()
+        directions = set(self._directions())
+        if len(directions) == 1:
+            rows = self._page(self._sorted_rows(), DESCENDING in directions)
+        else:
+            with self._client._lock:
+                rows = self._rows()
+            rows.sort(key=functools.cmp_to_key(lambda a, b: self._cmp(a[0], b[0])))
+            if self._cursor is not None:
+                cursor = self._cursor_key()
+                minimum = 0 if self._inclusive else 1
+                rows = [
+                    row
+                    for row in rows
+                    if self._cmp(row[0][: len(cursor)], cursor) >= minimum
+                ]
+            if self._limit is not None:
+                rows = rows[: self._limit]
+
+        for _, document_id, data in rows:
+            reference = FakeDocument(self._client, f"{self._path}/{document_id}")
+            yield FakeSnapshot(reference, data, self._fields)
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction))
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, path):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, document_id=None):
+        return FakeDocument(self._client, f"{self._path}/{document_id or _new_id()}")
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return datetime.now(timezone.utc), ref
+
+    def list_documents(self):
+        # Como en Firestore, incluye los documentos que solo tienen subcolecciones
+        prefix = f"{self._path}/"
+        with self._client._lock:
+            ids = set(self._client._collections.get(self._path, {}))
+            for path in self._client._collections:
+                if path.startswith(prefix):
+                    ids.add(path[len(prefix) :].split("/", 1)[0])
+        return [self.document(document_id) for document_id in sorted(ids)]
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(("set", reference, data, merge))
+
+    def create(self, reference, data):
+        self._writes.append(("create", reference, data, False))
+
+    def update(self, reference, data):
+        self._writes.append(("update", reference, data, True))
+
+    def delete(self, reference):
+        self._writes.append(("delete", reference, None, False))
+
+    def commit(self):
+        writes, self._writes = self._writes, []
+        self._client._write(writes)
+        return writes
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Lo mínimo que necesita @firestore.transactional para ejecutar la función"""
+
+    _read_only = False
+    _max_attempts = 1
+    _id = None
+
+    def _clean_up(self):
+        self._writes = []
+
+    def _begin(self, retry_id=None):
+        self._id = _new_id().encode()
+
+    def _commit(self):
+        return self.commit()
+
+    def _rollback(self):
+        self._writes = []
+
+
+class FakeFirestore:
+    """Cliente de Firestore en memoria, seguro entre hilos"""
+
+    def __init__(self, latency=0.0):
+        # Segundos que tarda cada lectura, como el viaje de ida y vuelta a Firestore
+        self.latency = latency
+        # {ruta de la colección: {id: datos}}
+        self._collections = {}
+        # {(ruta de la colección, campo): {valor: ids}}, creados bajo demanda
+        self._indexes = {}
+        # Versión de cada colección y resultados ordenados de las consultas
+        self._versions = {}
+        self._query_cache = {}
+        self._lock = threading.RLock()
+
+    def _round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _index(self, path, field):
+        index = self._indexes.get((path, field))
+        if index is None:
+            index = self._indexes[(path, field)] = {}
+            for document_id, data in self._collections.get(path, {}).items():
+                if field in data:
+                    index.setdefault(data[field], set()).add(document_id)
+        return index
+
+    def _reindex(self, path, document_id, old, new):
+        for (index_path, field), index in self._indexes.items():
+            if index_path != path:
+                continue
+            if old is not None and field in old:
+                index.get(old[field], set()).discard(document_id)
+            if new is not None and field in new:
+                index.setdefault(new[field], set()).add(document_id)
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def document(self, path):
+        return FakeDocument(self, path)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, **kwargs):
+        return FakeTransaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        return [reference.get(field_paths=field_paths) for reference in references]
+
+    def _write(self, writes):
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for kind, reference, data, merge in writes:
+                documents = self._collections.setdefault(reference._parent, {})
+                self._versions[reference._parent] = (
+                    self._versions.get(reference._parent, 0) + 1
+                )
+                current = documents.get(reference.id)
+                before = dict(current) if current is not None else None
+                if kind == "delete":
+                    documents.pop(reference.id, None)
+                    self._reindex(reference._parent, reference.id, before, None)
+                    continue
+                if kind == "create" and current is not None:
+                    raise ValueError(f"Document already exists: {reference.path}")
+                if kind == "update" and current is None:
+                    raise ValueError(f"No document to update: {reference.path}")
+                data = _resolve(data, now)
+                if merge and current is not None:
+                    _merge(current, data)
+                else:
+                    current = documents[reference.id] = {}
+                    _merge(current, data)
+                self._reindex(reference._parent, reference.id, before, current)
+
+    def __len__(self):
+        return sum(len(documents) for documents in self._collections.values())
+
+
+_ids = itertools.count()
+
+
+def _new_id():
+    return f"{next(_ids):08x}{uuid.uuid4().hex[:12]}"
+
+
+class FakeGeminiModel:
+    """generate_content con latencia fija (repartida entre fragmentos si es streaming)"""
+
+    def __init__(self, latency=0.0, chunks=4, reply="Gracias por contármelo."):
+        self.latency = latency
+        self.chunks = chunks
+        self.reply = reply
+
+    def _usage(self, prompt):
+        return SimpleNamespace(
+            prompt_token_count=max(1, len(str(prompt)) // 4),
+            candidates_token_count=max(1, len(self.reply) // 4),
+        )
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        usage = self._usage(prompt)
+        if not stream:
+            time.sleep(self.latency)
+            return SimpleNamespace(text=self.reply, usage_metadata=usage)
+        return FakeStreamResponse(self, usage)
+
+
+class FakeStreamResponse:
+    def __init__(self, model, usage):
+        self._model = model
+        self.usage_metadata = usage
+
+    def __iter__(self):
+        size = max(1, len(self._model.reply) // self._model.chunks + 1)
+        for start in range(0, len(self._model.reply), size):
+            time.sleep(self._model.latency / self._model.chunks)
+            yield SimpleNamespace(text=self._model.reply[start : start + size])
+
+
+def fake_verify_token(token):
+    """Acepta cualquier token no vacío y lo usa como uid"""
+    if not token:
+        return None
+    return {
+        "uid": token,
+        "email": f"{token}@example.com",
+        "name": token,
+        "exp": time.time() + 3600,
+    }
@@ -0,0 +1,299 @@
+"""
+Llamadas a Gemini acotadas: máximo de llamadas simultáneas con una cola de
+espera limitada, plazo por llamada, reintentos con backoff aleatorio y un
+circuit breaker para que un modelo lento o caído no bloquee al resto de la API
+"""
+import random
+import threading
+import time
+
+try:
+    import metrics
+    from logs import get_logger
+except ImportError:
+    from backend import metrics
+    from backend.logs import get_logger
+
+log = get_logger(__name__)
+
+# Errores de google.api_core (y de red) que vale la pena reintentar
+TRANSIENT_ERRORS = {
+    "TooManyRequests",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "InternalServerError",
+    "DeadlineExceeded",
+    "GatewayTimeout",
+    "TimeoutError",
+    "ConnectionError",
+}
+
+
+def is_transient(error):
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class GeminiUnavailable(Exception):
+    """Gemini no puede atender la llamada ahora; se responde 503 con Retry-After"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Gemini unavailable ({reason})")
+        self.reason = reason
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class CircuitBreaker:
+    """
+    Cerrado: deja pasar todo. Tras `threshold` fallos seguidos se abre durante
+    `cooldown` segundos y rechaza sin llamar; después deja pasar una sola
+    llamada de prueba (semiabierto) que lo cierra o lo vuelve a abrir.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_after(self):
+        """Segundos hasta que se vuelva a intentar, o 0 si se puede llamar ya"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+            if self.state == self.HALF_OPEN and self._probing:
+                return self.cooldown
+            return 0.0
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() < self._opened_at + self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                log.info("gemini_breaker_closed")
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+                if self.state != self.OPEN:
+                    log.warning("gemini_breaker_opened", failures=self._failures)
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self):
+        """La llamada de prueba terminó sin decidir nada (p. ej. error del cliente)"""
+        with self._lock:
+            self._probing = False
+
+
+class GeminiGuard:
+    """Estado compartido por todas las llamadas a Gemini del proceso"""
+
+    def __init__(
+        self,
+        max_concurrent=8,
+        max_queue=32,
+        queue_timeout=5.0,
+        timeout=30.0,
+        max_retries=2,
+        backoff=0.5,
+        breaker_threshold=5,
+        breaker_cooldown=30.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self.in_flight = 0
+        self.queued = 0
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            max_concurrent=config["GEMINI_MAX_CONCURRENT"],
+            max_queue=config["GEMINI_MAX_QUEUE"],
+            queue_timeout=config["GEMINI_QUEUE_TIMEOUT"],
+            timeout=config["GEMINI_TIMEOUT"],
+            max_retries=config["GEMINI_MAX_RETRIES"],
+            breaker_threshold=config["GEMINI_BREAKER_THRESHOLD"],
+            breaker_cooldown=config["GEMINI_BREAKER_COOLDOWN"],
+        )
+
+    def wrap(self, model):
+        return GuardedModel(model, self) if model is not None else None
+
+    def retry_after(self):
+        return self.breaker.retry_after()
+
+    def healthy(self):
+        """Breaker cerrado: las llamadas prescindibles no gastan la de prueba"""
+        return self.breaker.state == CircuitBreaker.CLOSED
+
+    def reject(self, reason, retry_after):
+        metrics.gemini_rejected.inc(reason=reason)
+        raise GeminiUnavailable(reason, retry_after)
+
+    def acquire(self, deadline):
+        """Espera un hueco; rechaza si la cola está llena o la espera se alarga"""
+        if self._slots.acquire(blocking=False):
+            with self._lock:
+                self.in_flight += 1
+            return
+
+        with self._lock:
+            full = self.queued >= self.max_queue
+            if not full:
+                self.queued += 1
+        if full:
+            self.reject("queue_full", self.queue_timeout)
+
+        wait = min(self.queue_timeout, deadline - time.monotonic())
+        try:
+            acquired = self._slots.acquire(timeout=max(0.0, wait))
+        finally:
+            with self._lock:
+                self.queued -= 1
+        if not acquired:
+            self.reject("queue_timeout", self.queue_timeout)
+        with self._lock:
+            self.in_flight += 1
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+
+class GuardedModel:
+    """generate_content con el hueco, el plazo, los reintentos y el breaker de GeminiGuard"""
+
+    def __init__(self, model, guard):
+        self._model = model
+        self._guard = guard
+
+    def generate_content(self, *args, stream=False, **kwargs):
+        guard = self._guard
+        if not guard.breaker.allow():
+            guard.reject("breaker_open", guard.retry_after())
+
+        deadline = time.monotonic() + guard.timeout
+        try:
+            guard.acquire(deadline)
+        except GeminiUnavailable:
+            guard.breaker.release_probe()
+            raise
+
+        try:
+            response = self._call(args, kwargs, stream, deadline)
+        except BaseException:
+            guard.release()
+            raise
+        if stream:
+            # El hueco se libera cuando termina el stream, no al recibir la cabecera
+            return _GuardedStream(response, guard)
+        guard.release()
+        return response
+
+    def _call(self, args, kwargs, stream, deadline):
+        guard = self._guard
+        request_options = dict(kwargs.pop("request_options", None) or {})
+        attempt = 0
+        while True:
+            # Cada intento recibe solo lo que queda del plazo de la llamada
+            request_options["timeout"] = max(0.1, deadline - time.monotonic())
+            try:
+                response = self._model.generate_content(
+                    *args, stream=stream, request_options=request_options, **kwargs
+                )
+            except Exception as e:
+                if not is_transient(e):
+                    guard.breaker.release_probe()
+                    raise
+                # Backoff exponencial con jitter completo, sin pasarse del plazo
+                delay = random.uniform(0, guard.backoff * 2**attempt)
+                if attempt >= guard.max_retries or time.monotonic() + delay >= deadline:
+                    guard.breaker.record_failure()
+                    log.warning(
+                        "gemini_call_failed",
+                        attempts=attempt + 1,
+                        error_type=type(e).__name__,
+                    )
+                    retry_after = guard.retry_after() or guard.backoff * 2**attempt
+                    raise GeminiUnavailable("upstream_error", retry_after) from e
+                attempt += 1
+                metrics.gemini_retries.inc(error=type(e).__name__)
+                time.sleep(delay)
+            else:
+                # Un stream solo cuenta como éxito cuando termina (_GuardedStream)
+                if not stream:
+                    guard.breaker.record_success()
+                return response
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class _GuardedStream:
+    """
+    Respuesta en streaming que devuelve el hueco al agotarse o cerrarse. El
+    breaker registra el resultado al final: éxito si se recibe entera, fallo
+    si la corta un error transitorio; si se abandona, libera la prueba.
+    """
+
+    def __init__(self, response, guard):
+        self._response = response
+        self._guard = guard
+        self._released = False
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self._guard.breaker.release_probe()
+            self._guard.release()
+
+    def __iter__(self):
+        breaker = self._guard.breaker
+        try:
+            yield from self._response
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            breaker.record_failure()
+            log.warning("gemini_stream_failed", error_type=type(e).__name__)
+            retry_after = self._guard.retry_after() or self._guard.backoff
+            raise GeminiUnavailable("upstream_error", retry_after) from e
+        else:
+            breaker.record_success()
+        finally:
+            self._release()
+
+    def __del__(self):
+        self._release()
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
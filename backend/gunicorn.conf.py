@@ -0,0 +1,36 @@
+"""
+Configuración de gunicorn para servir la API fuera de Vercel:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Workers gthread: cada petición ocupa un hilo en lugar de un proceso entero, y
+los hilos sueltan el GIL mientras esperan a Gemini o a Firestore, así que un
+solo proceso atiende cientos de chats a la vez con poca memoria.
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '5000')}")
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "256"))
+
+# Gemini puede tardar decenas de segundos y el streaming mantiene la conexión
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recicla los workers de vez en cuando para acotar la memoria
+max_requests = 10000
+max_requests_jitter = 1000
+
+# Sin preload: los clientes gRPC de Firestore y Gemini no sobreviven a un fork
+preload_app = False
+errorlog = "-"
+
+# Los workers heredan estos valores salvo que ya estén definidos. Como mucho
+# 3/4 de los hilos esperan a Gemini (más una cola corta); el resto queda libre
+# para notas, calendario y demás rutas aunque el modelo vaya lento.
+os.environ.setdefault("GEMINI_MAX_CONCURRENT", str(threads * 3 // 4))
+os.environ.setdefault("GEMINI_MAX_QUEUE", str(threads // 8))
+os.environ.setdefault("IO_WORKERS", str(max(8, threads // 8)))
+os.environ.setdefault("WARMUP_ON_START", "true")
@@ -0,0 +1,92 @@
+"""
+Claves de idempotencia: los reintentos de una petición con la misma
+Idempotency-Key se atienden una sola vez y reciben la misma respuesta
+"""
+import threading
+from concurrent.futures import Future
+
+try:
+    import metrics
+    from cache import TTLCache
+except ImportError:
+    from backend import metrics
+    from backend.cache import TTLCache
+
+
+class IdempotencyConflict(Exception):
+    """La clave ya se usó con una petición distinta"""
+
+
+class IdempotencyStore:
+    """
+    Las peticiones en curso se guardan como Futures, así un duplicado
+    concurrente espera al primero en vez de repetir el trabajo; las terminadas
+    pasan a una TTLCache para responder los reintentos al instante.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.completed = TTLCache(maxsize, ttl)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key, fingerprint):
+        """
+        Reserva la clave y devuelve (future, origen). Con "executed" el llamante
+        hace el trabajo y lo publica con complete(); con "coalesced" o
+        "replayed", future.result() da la respuesta de la primera petición.
+        """
+        with self._lock:
+            entry = self.completed.get(key) or self._in_flight.get(key)
+            leader = entry is None
+            if leader:
+                entry = (fingerprint, Future())
+                self._in_flight[key] = entry
+
+        stored_fingerprint, future = entry
+        if stored_fingerprint != fingerprint:
+            metrics.idempotent_requests.inc(result="conflict")
+            raise IdempotencyConflict(key)
+
+        if leader:
+            outcome = "executed"
+        else:
+            outcome = "replayed" if future.done() else "coalesced"
+        metrics.idempotent_requests.inc(result=outcome)
+        return future, outcome
+
+    def complete(self, key, future, response=None, error=None):
+        """
+        Publica la respuesta (cuerpo, estado, cabeceras) o la excepción de la
+        reserva `future`. Solo cuenta la primera llamada; los errores 5xx no se
+        guardan para que el cliente pueda reintentar.
+        """
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is None or entry[1] is not future:
+                return
+            del self._in_flight[key]
+            if error is None and response[1] < 500:
+                self.completed.set(key, entry)
+        if error is None:
+            future.set_result(response)
+        else:
+            future.set_exception(error)
+
+    def run(self, key, fingerprint, fn):
+        """
+        Ejecuta fn() una vez por clave y devuelve (respuesta, origen), donde
+        origen es "executed", "coalesced" o "replayed". La respuesta es una
+        tupla (cuerpo, estado, cabeceras).
+        """
+        future, outcome = self.claim(key, fingerprint)
+        if outcome != "executed":
+            # Si la primera petición falló, se propaga la misma excepción
+            return future.result(), outcome
+
+        try:
+            response = fn()
+        except BaseException as e:
+            self.complete(key, future, error=e)
+            raise
+        self.complete(key, future, response)
+        return response, "executed"
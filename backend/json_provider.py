@@ -0,0 +1,64 @@
+"""
+Serialización JSON de las respuestas. Los datetimes (también los de Firestore)
+salen en ISO 8601 sin tener que convertirlos uno a uno en cada ruta.
+"""
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    from models import Schema
+except ImportError:
+    from backend.models import Schema
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """El proveedor de Flask, pero con fechas ISO 8601 en lugar de fechas HTTP"""
+
+    ensure_ascii = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        if isinstance(o, Schema):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(IsoJSONProvider):
+    """
+    orjson serializa en C; datetime y date van nativos y las subclases (p. ej.
+    DatetimeWithNanoseconds de Firestore) pasan por `default`.
+    """
+
+    OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def dumps_bytes(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Sin pasar por str: el cuerpo ya sale en bytes UTF-8
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
+PROVIDERS = {"orjson": OrjsonProvider, "default": IsoJSONProvider}
+
+
+def create_json_provider(app, name):
+    """JSON_PROVIDER="orjson" si está instalado; si no, el de Flask"""
+    if name == "orjson" and orjson is None:
+        name = "default"
+    return PROVIDERS[name](app)
@@ -0,0 +1,102 @@
+"""
+Logs estructurados: una línea JSON por evento. Los eventos de alto volumen
+(uno por petición) se muestrean; advertencias y errores se escriben siempre.
+"""
+import json
+import logging
+import random
+import sys
+
+try:
+    from metrics import ErrorCountHandler, current_route
+except ImportError:
+    from backend.metrics import ErrorCountHandler, current_route
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+            "route": current_route(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Deja pasar solo una fracción de los eventos marcados como muestreables"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if not getattr(record, "sampled", False):
+            return True
+        return random.random() < self.rate
+
+
+class EventLogger:
+    """`log.info("note_created", note_id=...)` en lugar de print con f-strings"""
+
+    def __init__(self, logger):
+        self._logger = logger
+
+    def _log(self, level, event, fields, sampled=False, exc_info=False):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(
+                level,
+                event,
+                exc_info=exc_info,
+                extra={"fields": fields, "sampled": sampled},
+            )
+
+    def debug(self, event, **fields):
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        self._log(logging.INFO, event, fields)
+
+    def sampled(self, event, **fields):
+        """Evento informativo frecuente, sujeto a LOG_SAMPLE_RATE"""
+        self._log(logging.INFO, event, fields, sampled=True)
+
+    def warning(self, event, **fields):
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event, **fields):
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event, **fields):
+        """Error con la traza de la excepción que se está manejando"""
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+ROOT = "zenith"
+
+
+def configure(level="INFO", sample_rate=1.0):
+    logger = logging.getLogger(ROOT)
+    logger.setLevel(level)
+    logger.propagate = False
+    logger.handlers.clear()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    stream.addFilter(SampleFilter(sample_rate))
+    logger.addHandler(stream)
+    logger.addHandler(ErrorCountHandler())
+
+
+def get_logger(name=None):
+    """
+    Logger del árbol "zenith", el único que configure() prepara: el de un
+    módulo (`get_logger(__name__)`) cuelga de él y hereda nivel y handlers.
+    """
+    if name and name != ROOT:
+        name = f"{ROOT}.{name}"
+    return EventLogger(logging.getLogger(name or ROOT))
@@ -0,0 +1,527 @@
+"""
+Métricas del proceso en formato de texto de Prometheus: latencia por ruta,
+operaciones de Firestore por petición, latencia y tokens de Gemini, aciertos
+de caché y errores
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """Valor instantáneo; con `collect` se calcula en cada lectura"""
+
+    type = "gauge"
+
+    def __init__(self, name, help, labels=(), collect=None, type=None):
+        super().__init__(name, help, labels)
+        self._collect = collect
+        if type:
+            self.type = type
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self):
+        if self._collect:
+            with self._lock:
+                self._values = {
+                    tuple(map(str, key)): value for key, value in self._collect()
+                }
+        return super()._samples()
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, (list(e[0]), e[1], e[2])) for key, e in self._values.items()]
+
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=(), collect=None, type=None):
+        return self.register(Gauge(name, help, labels, collect, type))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+http_requests = REGISTRY.counter(
+    "zenith_http_requests_total",
+    "Peticiones HTTP atendidas",
+    ("route", "method", "status"),
+)
+http_latency = REGISTRY.histogram(
+    "zenith_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP hasta enviar las cabeceras",
+    ("route", "method"),
+)
+firestore_operations = REGISTRY.counter(
+    "zenith_firestore_operations_total",
+    "Documentos leídos, escritos y borrados en Firestore",
+    ("route", "op"),
+)
+firestore_per_request = REGISTRY.histogram(
+    "zenith_firestore_operations_per_request",
+    "Operaciones de Firestore hechas por cada petición",
+    ("route", "op"),
+    COUNT_BUCKETS,
+)
+firestore_latency = REGISTRY.histogram(
+    "zenith_firestore_rpc_duration_seconds",
+    "Latencia de las llamadas RPC a Firestore",
+    ("method",),
+)
+auth_latency = REGISTRY.histogram(
+    "zenith_auth_verify_duration_seconds",
+    "Latencia de la verificación de tokens de Firebase (sin contar la caché)",
+    ("result",),
+)
+gemini_latency = REGISTRY.histogram(
+    "zenith_gemini_request_duration_seconds",
+    "Latencia de generate_content, hasta el último fragmento si es streaming",
+    ("stream",),
+)
+gemini_tokens = REGISTRY.counter(
+    "zenith_gemini_tokens_total",
+    "Tokens consumidos en Gemini",
+    ("kind",),
+)
+gemini_errors = REGISTRY.counter(
+    "zenith_gemini_errors_total",
+    "Llamadas a Gemini que fallaron",
+    ("type",),
+)
+gemini_retries = REGISTRY.counter(
+    "zenith_gemini_retries_total",
+    "Reintentos de llamadas a Gemini tras un error transitorio",
+    ("error",),
+)
+gemini_rejected = REGISTRY.counter(
+    "zenith_gemini_rejected_total",
+    "Llamadas a Gemini rechazadas sin llamar (cola llena, espera agotada o breaker abierto)",
+    ("reason",),
+)
+idempotent_requests = REGISTRY.counter(
+    "zenith_idempotent_requests_total",
+    "Peticiones con Idempotency-Key según se ejecutaron, esperaron a otra o se repitieron",
+    ("result",),
+)
+errors = REGISTRY.counter(
+    "zenith_errors_total",
+    "Errores registrados en los logs",
+    ("route", "event"),
+)
+
+
+# --- Contexto de la petición -------------------------------------------------
+
+
+class RequestStats:
+    """Ruta y operaciones de Firestore de la petición en curso"""
+
+    OPS = ("read", "write", "delete")
+
+    def __init__(self, route):
+        self.route = route
+        self.started = time.perf_counter()
+        self.firestore = dict.fromkeys(self.OPS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, op, amount):
+        with self._lock:
+            self.firestore[op] += amount
+
+
+_current = contextvars.ContextVar("zenith_request_stats", default=None)
+
+
+def begin_request(route):
+    stats = RequestStats(route)
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    try:
+        _current.reset(token)
+    except ValueError:
+        # El token se creó en otro contexto (p. ej. otro hilo): no hay nada que restaurar
+        _current.set(None)
+
+
+def current_stats():
+    stats = _current.get()
+    if stats is None:
+        # Las respuestas en streaming siguen dentro del contexto de Flask
+        from flask import g, has_app_context
+
+        if has_app_context():
+            stats = g.get("request_stats")
+    return stats
+
+
+def current_route():
+    stats = current_stats()
+    return stats.route if stats else "background"
+
+
+def record_firestore(op, amount, stats=None):
+    if not amount:
+        return
+    stats = stats or current_stats()
+    if stats:
+        stats.add(op, amount)
+    firestore_operations.inc(
+        amount, route=stats.route if stats else "background", op=op
+    )
+
+
+def observe_request(stats, method, status):
+    duration = time.perf_counter() - stats.started
+    http_requests.inc(route=stats.route, method=method, status=status)
+    http_latency.observe(duration, route=stats.route, method=method)
+    for op, amount in stats.firestore.items():
+        firestore_per_request.observe(amount, route=stats.route, op=op)
+    return duration
+
+
+# --- Firestore ----------------------------------------------------------------
+
+
+class _ObservedStream:
+    """Iterador de una RPC en streaming que cuenta cada respuesta al consumirla"""
+
+    def __init__(self, stream, on_item, on_done):
+        self._stream = stream
+        self._on_item = on_item
+        self._on_done = on_done
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            item = next(self._stream)
+        except StopIteration:
+            self._on_done()
+            raise
+        self._on_item(item)
+        return item
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _has_field(message, field):
+    return getattr(message, "_pb", message).HasField(field)
+
+
+def _write_op(write):
+    kind = getattr(write, "_pb", write).WhichOneof("operation")
+    return "delete" if kind == "delete" else "write"
+
+
+def _instrument_stream_rpc(api, method, counts_as_read):
+    call = getattr(api, method)
+
+    def wrapper(*args, **kwargs):
+        stats = current_stats()
+        start = time.perf_counter()
+        stream = call(*args, **kwargs)
+
+        def on_item(response):
+            if counts_as_read(response):
+                record_firestore("read", 1, stats)
+
+        def on_done():
+            firestore_latency.observe(time.perf_counter() - start, method=method)
+
+        return _ObservedStream(iter(stream), on_item, on_done)
+
+    setattr(api, method, wrapper)
+
+
+def _instrument_commit(api):
+    call = api.commit
+
+    def wrapper(*args, request=None, **kwargs):
+        stats = current_stats()
+        start = time.perf_counter()
+        try:
+            return call(*args, request=request, **kwargs)
+        finally:
+            firestore_latency.observe(time.perf_counter() - start, method="commit")
+            writes = (request or {}).get("writes") or []
+            ops = [_write_op(write) for write in writes]
+            record_firestore("write", ops.count("write"), stats)
+            record_firestore("delete", ops.count("delete"), stats)
+
+    api.commit = wrapper
+
+
+def instrument_firestore(client):
+    """
+    Envuelve las RPC del cliente de Firestore para contar documentos leídos,
+    escritos y borrados. Se instrumenta la capa GAPIC porque por ahí pasan
+    consultas, lecturas sueltas, lotes y transacciones.
+    """
+    if client is None:
+        return client
+
+    api = client._firestore_api
+    _instrument_stream_rpc(
+        api, "run_query", lambda response: _has_field(response, "document")
+    )
+    _instrument_stream_rpc(
+        api, "batch_get_documents", lambda response: _has_field(response, "found")
+    )
+    _instrument_commit(api)
+    return client
+
+
+# --- Gemini -------------------------------------------------------------------
+
+
+def _record_usage(response):
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return
+    gemini_tokens.inc(getattr(usage, "prompt_token_count", 0) or 0, kind="prompt")
+    gemini_tokens.inc(
+        getattr(usage, "candidates_token_count", 0) or 0, kind="completion"
+    )
+
+
+class _ObservedResponse:
+    """Respuesta en streaming de Gemini que mide la latencia hasta el final"""
+
+    def __init__(self, response, start):
+        self._response = response
+        self._start = start
+
+    def __iter__(self):
+        try:
+            yield from self._response
+        except Exception as e:
+            gemini_errors.inc(type=type(e).__name__)
+            raise
+        gemini_latency.observe(time.perf_counter() - self._start, stream="true")
+        _record_usage(self._response)
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+class InstrumentedModel:
+    """Envoltorio de GenerativeModel que registra latencia, tokens y errores"""
+
+    def __init__(self, model):
+        self._model = model
+
+    def generate_content(self, *args, stream=False, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self._model.generate_content(*args, stream=stream, **kwargs)
+        except Exception as e:
+            gemini_errors.inc(type=type(e).__name__)
+            raise
+
+        if stream:
+            return _ObservedResponse(response, start)
+        gemini_latency.observe(time.perf_counter() - start, stream="false")
+        _record_usage(response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+def instrument_model(model):
+    return InstrumentedModel(model) if model is not None else None
+
+
+# --- Cachés y logs ------------------------------------------------------------
+
+
+def register_caches(caches, background=None):
+    """Expone los contadores de cada TTLCache ({nombre: caché})"""
+
+    def collect(field):
+        return lambda: [
+            ((name,), cache.stats()[field]) for name, cache in caches.items()
+        ]
+
+    REGISTRY.gauge(
+        "zenith_cache_hits_total",
+        "Aciertos de cada caché en memoria",
+        ("cache",),
+        collect("hits"),
+        type="counter",
+    )
+    REGISTRY.gauge(
+        "zenith_cache_misses_total",
+        "Fallos de cada caché en memoria",
+        ("cache",),
+        collect("misses"),
+        type="counter",
+    )
+    REGISTRY.gauge(
+        "zenith_cache_hit_ratio",
+        "Proporción de aciertos de cada caché",
+        ("cache",),
+        collect("hit_rate"),
+    )
+    REGISTRY.gauge(
+        "zenith_cache_entries", "Entradas en cada caché", ("cache",), collect("size")
+    )
+    if background is not None:
+        REGISTRY.gauge(
+            "zenith_background_pending",
+            "Tareas en segundo plano pendientes",
+            collect=lambda: [((), background.pending)],
+        )
+
+
+def register_gemini_guard(guard):
+    """Expone la ocupación de Gemini y el estado del circuit breaker"""
+    REGISTRY.gauge(
+        "zenith_gemini_in_flight",
+        "Llamadas a Gemini en curso",
+        collect=lambda: [((), guard.in_flight)],
+    )
+    REGISTRY.gauge(
+        "zenith_gemini_queue_depth",
+        "Llamadas a Gemini esperando un hueco",
+        collect=lambda: [((), guard.queued)],
+    )
+    REGISTRY.gauge(
+        "zenith_gemini_breaker_state",
+        "Estado del circuit breaker de Gemini (1 en el estado actual)",
+        ("state",),
+        lambda: [
+            ((state,), int(guard.breaker.state == state))
+            for state in ("closed", "half_open", "open")
+        ],
+    )
+
+
+class ErrorCountHandler(logging.Handler):
+    """Cuenta en zenith_errors_total cada log de nivel ERROR o superior"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+
+    def emit(self, record):
+        errors.inc(route=current_route(), event=record.getMessage())
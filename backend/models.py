@@ -1,4 +1,8 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Incrementar al cambiar Emotion.EMOTIONS o Consejo.CONSEJOS para invalidar
+# las copias que los clientes guardan en caché
+CATALOG_VERSION = 1
 
 class Emotion:
     EMOTIONS = [
@@ -15,31 +19,86 @@ class Emotion:
     def get_all():
         return Emotion.EMOTIONS
 
-class Note:
-    def __init__(self, user_id, title, content, emotion_name, emotion_emoji, timestamp=None):
-        self.user_id = user_id
+class ValidationError(ValueError):
+    """Cuerpo de una petición que no cumple el esquema; se responde 400"""
+
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+
+def _json_object(data):
+    if not isinstance(data, dict):
+        raise ValidationError(None, 'Body must be a JSON object')
+    return data
+
+def _text(data, key, max_length, required=False):
+    """Texto del cuerpo: '' si falta, salvo que sea obligatorio (y no vacío)"""
+    value = data.get(key)
+    if value is None or (required and value == ''):
+        if required:
+            raise ValidationError(key, f'{key.capitalize()} is required')
+        return ''
+    if not isinstance(value, str):
+        raise ValidationError(key, f"'{key}' must be a string")
+    if len(value) > max_length:
+        raise ValidationError(key, f"'{key}' must be at most {max_length} characters")
+    return value
+
+class Schema:
+    """
+    Base de los modelos: atributos en __slots__ (sin __dict__ por instancia).
+    Cada subclase define to_dict y from_json, que valida el cuerpo de la
+    petición y lanza ValidationError. El proveedor JSON serializa cualquier
+    Schema con su to_dict.
+    """
+    __slots__ = ()
+
+class Note(Schema):
+    __slots__ = ('email', 'title', 'content', 'emotion_name', 'emotion_emoji')
+
+    def __init__(self, email, title='', content='', emotion_name='', emotion_emoji=''):
+        self.email = email
         self.title = title
         self.content = content
         self.emotion_name = emotion_name
         self.emotion_emoji = emotion_emoji
-        self.timestamp = timestamp or datetime.now()
+
+    @classmethod
+    def from_json(cls, data, *, email):
+        data = _json_object(data)
+        return cls(
+            email,
+            _text(data, 'title', 200),
+            _text(data, 'content', 20000),
+            _text(data, 'emotion_name', 50),
+            _text(data, 'emotion_emoji', 16),
+        )
 
     def to_dict(self):
+        # El timestamp lo asigna el repositorio al guardar
         return {
-            'user_id': self.user_id,
+            'email': self.email,
             'title': self.title,
             'content': self.content,
             'emotion_name': self.emotion_name,
-            'emotion_emoji': self.emotion_emoji,
-            'timestamp': self.timestamp
+            'emotion_emoji': self.emotion_emoji
         }
 
-class ChatMessage:
+class ChatMessage(Schema):
+    __slots__ = ('user_id', 'text', 'is_user_message', 'timestamp')
+
     def __init__(self, user_id, text, is_user_message, timestamp=None):
         self.user_id = user_id
         self.text = text
         self.is_user_message = is_user_message
-        self.timestamp = timestamp or datetime.now()
+        self.timestamp = timestamp or datetime.now(timezone.utc)
+
+    @classmethod
+    def from_json(cls, data, *, user_id, is_user_message, timestamp=None):
+        """Cuerpo de /api/chat/send y /api/chat/stream"""
+        data = _json_object(data)
+        text = _text(data, 'message', 4000, required=True)
+        return cls(user_id, text, is_user_message, timestamp)
 
     def to_dict(self):
         return {
@@ -49,8 +108,13 @@ class ChatMessage:
             'timestamp': self.timestamp
         }
 
-class Psicologo:
-    def __init__(self, nombre, especialidad, telefono_celular, telefono_oficina, 
+class Psicologo(Schema):
+    __slots__ = (
+        'nombre', 'especialidad', 'telefono_celular', 'telefono_oficina',
+        'correo_electronico', 'direccion', 'ubicacion_url', 'foto_url',
+    )
+
+    def __init__(self, nombre, especialidad, telefono_celular, telefono_oficina,
                  correo_electronico, direccion, ubicacion_url='', foto_url=''):
         self.nombre = nombre
         self.especialidad = especialidad
@@ -61,6 +125,20 @@ class Psicologo:
         self.ubicacion_url = ubicacion_url
         self.foto_url = foto_url
 
+    @classmethod
+    def from_json(cls, data):
+        data = _json_object(data)
+        return cls(
+            _text(data, 'nombre', 200),
+            _text(data, 'especialidad', 200),
+            _text(data, 'telefonoCelular', 40),
+            _text(data, 'telefonoOficina', 40),
+            _text(data, 'correoElectronico', 254),
+            _text(data, 'direccion', 500),
+            _text(data, 'ubicacionUrl', 2048),
+            _text(data, 'fotoUrl', 2048),
+        )
+
     def to_dict(self):
         return {
             'nombre': self.nombre,
@@ -0,0 +1,184 @@
+"""
+Estadísticas de estado de ánimo calculadas con NumPy sobre arreglos compactos
+(índice de emoción y timestamp en segundos) en lugar de diccionarios por nota
+"""
+import numpy as np
+
+try:
+    from models import Emotion
+except ImportError:
+    from backend.models import Emotion
+
+EMOTION_NAMES = [emotion["name"] for emotion in Emotion.EMOTIONS]
+EMOTION_INDEX = {emotion["name"]: i for i, emotion in enumerate(Emotion.EMOTIONS)}
+EMOTION_INDEX.update(
+    {emotion["emoji"]: i for i, emotion in enumerate(Emotion.EMOTIONS)}
+)
+
+# Valencia de cada emoción para las tendencias (-1 negativa, 1 positiva)
+VALENCE = np.array(
+    [
+        {
+            "Feliz": 1.0,
+            "Triste": -1.0,
+            "Enojado": -1.0,
+            "Ansioso": -1.0,
+            "Agradecido": 1.0,
+            "Cansado": -0.5,
+            "Normal": 0.0,
+        }.get(name, 0.0)
+        for name in EMOTION_NAMES
+    ]
+)
+
+SECONDS_PER_DAY = 86400
+WEEKDAYS = ["lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo"]
+
+
+def notes_to_arrays(labels, timestamps):
+    """
+    Convierte las etiquetas de emoción (nombre o emoji) y los timestamps de las
+    notas en dos arreglos: índices de emoción (int8) y segundos UNIX (int64).
+    Se descartan las notas con una emoción desconocida.
+    """
+    if not labels:
+        return np.empty(0, dtype=np.int8), np.empty(0, dtype=np.int64)
+
+    # Se traduce cada etiqueta distinta una sola vez
+    unique_labels, inverse = np.unique(np.array(labels, dtype=str), return_inverse=True)
+    lookup = np.array(
+        [EMOTION_INDEX.get(label, -1) for label in unique_labels], dtype=np.int8
+    )
+    emotions = lookup[inverse]
+    seconds = np.array(timestamps, dtype=np.float64).astype(np.int64)
+
+    known = emotions >= 0
+    return emotions[known], seconds[known]
+
+
+def _counts_by_period(periods, emotions, labels):
+    keys, inverse = np.unique(periods, return_inverse=True)
+    counts = np.zeros((len(keys), len(EMOTION_NAMES)), dtype=np.int64)
+    np.add.at(counts, (inverse, emotions), 1)
+    return [
+        {
+            "period": labels(key),
+            "total": int(row.sum()),
+            "counts": dict(zip(EMOTION_NAMES, row.tolist())),
+        }
+        for key, row in zip(keys, counts)
+    ]
+
+
+def _streaks(days, today):
+    unique_days = np.unique(days)
+    if len(unique_days) == 0:
+        return {"current": 0, "longest": 0}
+
+    # Cada racha empieza donde el salto entre días registrados es mayor que 1
+    breaks = np.flatnonzero(np.diff(unique_days) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(unique_days)]))
+    lengths = ends - starts
+
+    current = int(lengths[-1]) if unique_days[-1] >= today - 1 else 0
+    return {"current": current, "longest": int(lengths.max())}
+
+
+def _rolling_trend(days, emotions, today, trend_days, windows):
+    last_day = max(int(days.max()), today)
+    first_day = last_day - trend_days + 1
+    # Se incluyen días previos para que las medias móviles arranquen completas
+    origin = first_day - max(windows) + 1
+    mask = days >= origin
+    offsets = days[mask] - origin
+    length = last_day - origin + 1
+
+    daily_sum = np.bincount(
+        offsets, weights=VALENCE[emotions[mask]], minlength=length
+    )
+    daily_count = np.bincount(offsets, minlength=length).astype(np.float64)
+
+    cum_sum = np.concatenate(([0.0], np.cumsum(daily_sum)))
+    cum_count = np.concatenate(([0.0], np.cumsum(daily_count)))
+    visible = np.arange(length - trend_days, length)
+
+    trend = {
+        "dates": [
+            str(np.datetime64(int(origin + i), "D")) for i in visible.tolist()
+        ],
+        "daily": _safe_mean(daily_sum[visible], daily_count[visible]),
+    }
+    for window in windows:
+        start = np.maximum(visible + 1 - window, 0)
+        trend[f"rolling_{window}"] = _safe_mean(
+            cum_sum[visible + 1] - cum_sum[start],
+            cum_count[visible + 1] - cum_count[start],
+        )
+    return trend
+
+
+def _safe_mean(sums, counts):
+    means = np.divide(
+        sums, counts, out=np.full(len(sums), np.nan), where=counts > 0
+    )
+    return [None if np.isnan(value) else round(value, 3) for value in means.tolist()]
+
+
+def compute_mood_analytics(
+    emotions, timestamps, now, trend_days=90, windows=(7, 30)
+):
+    """Calcula distribuciones, rachas, patrones por día de la semana y tendencias"""
+    today = int(now.timestamp()) // SECONDS_PER_DAY
+    result = {
+        "total_notes": int(len(emotions)),
+        "emotions": EMOTION_NAMES,
+        "distribution": dict(
+            zip(
+                EMOTION_NAMES,
+                np.bincount(emotions, minlength=len(EMOTION_NAMES)).tolist(),
+            )
+        ),
+    }
+    if len(emotions) == 0:
+        result.update(
+            {
+                "by_week": [],
+                "by_month": [],
+                "streaks": {"current": 0, "longest": 0},
+                "by_weekday": {},
+                "trend": {"dates": [], "daily": []},
+            }
+        )
+        return result
+
+    days = timestamps // SECONDS_PER_DAY
+    # El 1 de enero de 1970 fue jueves: (día + 3) // 7 agrupa semanas de lunes
+    # a domingo y (día + 3) % 7 da el día de la semana con lunes = 0
+    weeks = (days + 3) // 7
+    months = timestamps.astype("datetime64[s]").astype("datetime64[M]")
+    months = months.astype(np.int64)
+    weekdays = (days + 3) % 7
+
+    weekday_counts = np.zeros((7, len(EMOTION_NAMES)), dtype=np.int64)
+    np.add.at(weekday_counts, (weekdays, emotions), 1)
+
+    result.update(
+        {
+            "by_week": _counts_by_period(
+                weeks,
+                emotions,
+                lambda week: str(np.datetime64(int(week * 7 - 3), "D")),
+            ),
+            "by_month": _counts_by_period(
+                months, emotions, lambda month: str(np.datetime64(int(month), "M"))
+            ),
+            "streaks": _streaks(days, today),
+            "by_weekday": {
+                WEEKDAYS[i]: dict(zip(EMOTION_NAMES, row.tolist()))
+                for i, row in enumerate(weekday_counts)
+            },
+            "trend": _rolling_trend(days, emotions, today, trend_days, windows),
+        }
+    )
+    return result
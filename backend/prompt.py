@@ -0,0 +1,81 @@
+"""
+Construcción del prompt del chat con un presupuesto de tokens y resumen acumulado
+"""
+
+try:
+    from logs import get_logger
+except ImportError:
+    from backend.logs import get_logger
+
+log = get_logger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text):
+    """Estimación local de tokens (~4 caracteres por token), sin llamar a la API"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_tokens(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    # Se conserva el final: lo más reciente es lo más relevante
+    return "…" + text[-(max_chars - 1):]
+
+
+class PromptBuilder:
+    def __init__(self, token_budget, max_messages, summary_max_tokens):
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        self.summary_max_tokens = summary_max_tokens
+
+    def build(self, user_name, messages, user_message, summary=""):
+        """
+        Llena el presupuesto con los mensajes más recientes hacia atrás.
+        Devuelve (prompt, tokens_del_prompt, mensajes_descartados).
+        """
+        header = f"Mi nombre es Zenith, un asistente psicológico virtual. Estoy hablando con {user_name}. "
+        if summary:
+            header += f"Resumen de la conversación anterior: {summary} "
+        footer = f"Responde al último mensaje: {user_message}"
+
+        used = count_tokens(header) + count_tokens(footer)
+        lines = []
+        for msg_data in reversed(messages[-self.max_messages:]):
+            sender = user_name if msg_data["is_user_message"] else "Zenith"
+            line = f"{sender}: {msg_data['text']}. "
+            tokens = count_tokens(line)
+            if used + tokens > self.token_budget:
+                break
+            lines.append(line)
+            used += tokens
+
+        lines.reverse()
+        dropped = messages[: len(messages) - len(lines)]
+        return header + "".join(lines) + footer, used, dropped
+
+    def summarize(self, model, user_name, summary, messages):
+        """Incorpora mensajes antiguos al resumen acumulado"""
+        transcript = "".join(
+            f"{user_name if m['is_user_message'] else 'Zenith'}: {m['text']}. "
+            for m in messages
+        )
+        if model:
+            request = (
+                f"Resume en español, en menos de {self.summary_max_tokens * 3 // 4} palabras, "
+                f"la conversación entre {user_name} y Zenith, un asistente psicológico. "
+                f"Conserva temas, emociones y datos personales relevantes. "
+                f"Resumen previo: {summary or '(ninguno)'} "
+                f"Mensajes nuevos: {transcript}"
+            )
+            try:
+                return truncate_tokens(
+                    model.generate_content(request).text.strip(),
+                    self.summary_max_tokens,
+                )
+            except Exception as e:
+                log.warning("summary_fallback", error=str(e))
+
+        return truncate_tokens(f"{summary} {transcript}".strip(), self.summary_max_tokens)
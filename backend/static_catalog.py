@@ -0,0 +1,41 @@
+"""
+Catálogos constantes (emociones, consejos) serializados una sola vez al arrancar
+"""
+import hashlib
+import json
+
+from flask import Response
+
+try:
+    from compression import ENCODINGS, compress, best_encoding
+except ImportError:
+    from backend.compression import ENCODINGS, compress, best_encoding
+
+ETAG_SUFFIXES = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+class StaticCatalog:
+    def __init__(self, data, version, max_age):
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        body = body.encode("utf-8")
+        etag = f"v{version}-{hashlib.sha256(body).hexdigest()[:16]}"
+
+        self.version = version
+        self.cache_control = f"public, max-age={max_age}"
+        self.variants = {
+            encoding: (compress(body, encoding), etag + ETAG_SUFFIXES[encoding])
+            for encoding in ["identity"] + ENCODINGS
+        }
+
+    def response(self, request):
+        encoding = best_encoding(request, ENCODINGS)
+        body, etag = self.variants[encoding]
+
+        response = Response(body, mimetype="application/json")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = self.cache_control
+        response.headers["X-Catalog-Version"] = str(self.version)
+        response.set_etag(etag)
+        return response.make_conditional(request)
@@ -0,0 +1,993 @@
+"""
+Capa de almacenamiento: repositorios de notas, mensajes del chat y psicólogos
+con una implementación sobre Firestore y otra sobre SQLite (autoalojado)
+"""
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+try:
+    import chat_archive
+    import emotion_calendar
+    from bulk_delete import delete_in_batches
+    from logs import get_logger
+    from timestamps import from_micros, to_micros
+except ImportError:
+    from backend import chat_archive, emotion_calendar
+    from backend.bulk_delete import delete_in_batches
+    from backend.logs import get_logger
+    from backend.timestamps import from_micros, to_micros
+
+log = get_logger(__name__)
+
+# Equivale a firestore.Query.DESCENDING sin importar firebase_admin al arrancar
+DESCENDING = "DESCENDING"
+
+PSYCHOLOGIST_FIELDS = (
+    "nombre",
+    "especialidad",
+    "telefonoCelular",
+    "telefonoOficina",
+    "correoElectronico",
+    "direccion",
+    "ubicacionUrl",
+    "fotoUrl",
+)
+
+
+def merge_changes(notes, tombstones, since, limit):
+    """
+    Junta las notas cambiadas y borradas después de `since` (listas de
+    ((updated_at, id), datos) en orden, más si se llenó el límite) y devuelve
+    (notas, ids borrados, (updated_at, id) del último cambio, hay_más)
+    """
+    (changed_rows, notes_full), (deleted_rows, tombstones_full) = notes, tombstones
+    rows = [(key, note) for key, note in changed_rows]
+    rows += [(key, None) for key, _ in deleted_rows]
+    rows.sort(key=lambda row: row[0])
+
+    has_more = notes_full or tombstones_full or len(rows) > limit
+    rows = rows[:limit]
+    changed = [note for _, note in rows if note is not None]
+    deleted = [key[1] for key, note in rows if note is None]
+    return changed, deleted, rows[-1][0] if rows else since, has_more
+
+
+# --- Firestore ---------------------------------------------------------------
+
+
+class FirestoreNoteRepository:
+    def __init__(self, db, tombstone_days=90):
+        self.db = db
+        self.tombstone_days = tombstone_days
+
+    def _collection(self):
+        return self.db.collection("notas")
+
+    def _to_dict(self, snapshot):
+        note_data = snapshot.to_dict()
+        note_data["id"] = snapshot.id
+        return note_data
+
+    def page(self, email, page_size, before=None):
+        """
+        Notas del usuario de la más reciente a la más antigua, por (timestamp,
+        id). `before` es el (timestamp, id) de la última nota de la página
+        anterior; sin id (cursores antiguos) se corta solo por timestamp.
+        """
+        query = (
+            self._collection()
+            .where("email", "==", email)
+            .order_by("timestamp", direction=DESCENDING)
+            .order_by("__name__", direction=DESCENDING)
+        )
+        if before is not None:
+            timestamp, note_id = before
+            if note_id is None:
+                query = query.start_after({"timestamp": timestamp})
+            else:
+                query = query.start_after({"timestamp": timestamp, "__name__": note_id})
+        return [self._to_dict(note) for note in query.limit(page_size).stream()]
+
+    def iter_pages(self, email, page_size):
+        """
+        Todas las notas de la más antigua a la más reciente, una consulta por
+        página. El cursor es el último documento, así que las notas con el
+        mismo timestamp no se pierden entre páginas.
+        """
+        query = (
+            self._collection()
+            .where("email", "==", email)
+            .order_by("timestamp")
+            .limit(page_size)
+        )
+        last = None
+        while True:
+            page_query = query if last is None else query.start_after(last)
+            snapshots = list(page_query.stream())
+            if snapshots:
+                yield [self._to_dict(note) for note in snapshots]
+            if len(snapshots) < page_size:
+                return
+            last = snapshots[-1]
+
+    def list_all(self, email):
+        # Sin order_by para no depender del índice compuesto
+        notes = self._collection().where("email", "==", email).stream()
+        return [self._to_dict(note) for note in notes]
+
+    def emotion_samples(self, email):
+        """(etiquetas de emoción, timestamps en segundos) de todas las notas"""
+        notes = (
+            self._collection()
+            .where("email", "==", email)
+            .select(["emotion_name", "emotion_emoji", "timestamp"])
+            .stream()
+        )
+        labels = []
+        timestamps = []
+        for note in notes:
+            note_data = note.to_dict()
+            if note_data.get("timestamp"):
+                label = note_data.get("emotion_name") or note_data.get("emotion_emoji")
+                labels.append(label or "")
+                timestamps.append(note_data["timestamp"].timestamp())
+        return labels, timestamps
+
+    def get(self, note_id):
+        snapshot = self._collection().document(note_id).get()
+        return self._to_dict(snapshot) if snapshot.exists else None
+
+    def create(self, note_data):
+        from firebase_admin.firestore import SERVER_TIMESTAMP
+
+        # create_note_with_calendar pone el timestamp con el que marca el día
+        note_data = dict(note_data, updated_at=SERVER_TIMESTAMP)
+        return emotion_calendar.create_note_with_calendar(self.db, note_data)
+
+    def delete(self, note):
+        from firebase_admin.firestore import SERVER_TIMESTAMP
+
+        note_data = {key: value for key, value in note.items() if key != "id"}
+        note_ref = self._collection().document(note["id"])
+        tombstone = {
+            "email": note["email"],
+            "updated_at": SERVER_TIMESTAMP,
+            # La borra la política TTL de firestore.indexes.json (fieldOverrides);
+            # sin desplegarla las marcas caducadas se quedan en la colección
+            "expire_at": datetime.now(timezone.utc)
+            + timedelta(days=self.tombstone_days),
+        }
+        emotion_calendar.delete_note_with_calendar(
+            self.db, note_ref, note_data, tombstone
+        )
+
+    def _changed_since(self, collection, email, since, limit):
+        query = (
+            collection.where("email", "==", email)
+            .order_by("updated_at")
+            .order_by("__name__")
+        )
+        # Firestore desempata por id: aunque más de `limit` documentos compartan
+        # updated_at, cada página empieza justo después de la anterior. Un
+        # token sin id (listado completo) incluye todo lo empatado con él.
+        updated_at, last_id = since
+        if last_id:
+            query = query.start_after({"updated_at": updated_at, "__name__": last_id})
+        else:
+            query = query.start_at({"updated_at": updated_at})
+        rows = []
+        for snapshot in query.limit(limit + 1).stream():
+            data = self._to_dict(snapshot)
+            rows.append(((data["updated_at"], snapshot.id), data))
+        return rows[:limit], len(rows) > limit
+
+    def changes(self, email, since, limit):
+        """Notas creadas y borradas después de `since` ((updated_at, id))"""
+        return merge_changes(
+            self._changed_since(self._collection(), email, since, limit),
+            self._changed_since(
+                self.db.collection("notas_borradas"), email, since, limit
+            ),
+            since,
+            limit,
+        )
+
+    def calendar(self, email, start=None, end=None):
+        emotions_by_day = emotion_calendar.read_calendar(self.db, email, start, end)
+        if emotions_by_day is None:
+            # Primera carga de un usuario sin calendario materializado
+            log.info("calendar_backfill")
+            emotions_by_day = emotion_calendar.backfill_calendar(self.db, email)
+            if start and end:
+                emotions_by_day = {
+                    day: emoji
+                    for day, emoji in emotions_by_day.items()
+                    if start <= day[:7] <= end
+                }
+        return emotions_by_day
+
+
+class FirestoreChatRepository:
+    def __init__(self, db, max_in_flight=4):
+        self.db = db
+        self.max_in_flight = max_in_flight
+
+    def _conversation(self, user_id):
+        return self.db.collection("conversaciones").document(user_id)
+
+    def _messages(self, user_id):
+        return self._conversation(user_id).collection("mensajes")
+
+    def _archive(self, user_id):
+        return self._conversation(user_id).collection("archivo")
+
+    def new_id(self, user_id):
+        return self._messages(user_id).document().id
+
+    def add(self, user_id, message_data, message_id=None):
+        self._messages(user_id).document(message_id).set(message_data)
+
+    def page(self, user_id, page_size, before=None):
+        """Mensajes del más reciente al más antiguo; tras los vivos, los archivados"""
+        query = self._messages(user_id).order_by("timestamp", direction=DESCENDING)
+        if before is not None:
+            query = query.start_after({"timestamp": before})
+        messages = [msg.to_dict() for msg in query.limit(page_size).stream()]
+        if len(messages) < page_size:
+            oldest = messages[-1]["timestamp"] if messages else before
+            messages += self._archived_page(user_id, page_size - len(messages), oldest)
+        return messages
+
+    def _archived_page(self, user_id, page_size, before):
+        # Todo lo archivado es anterior a los mensajes vivos
+        query = self._archive(user_id).order_by("first", direction=DESCENDING)
+        if before is not None:
+            query = query.where("first", "<", before)
+        messages = []
+        for archive in query.limit(page_size).stream():
+            archived = chat_archive.unpack(user_id, archive.get("data"))
+            messages += [
+                msg
+                for msg in reversed(archived)
+                if before is None or msg["timestamp"] < before
+            ]
+            if len(messages) >= page_size:
+                break
+        return messages[:page_size]
+
+    def iter_pages(self, user_id, page_size):
+        """
+        Toda la conversación del mensaje más antiguo al más reciente: primero
+        los archivos (una página por archivo) y después los mensajes vivos
+        """
+        query = self._archive(user_id).order_by("first").limit(1)
+        last = None
+        while True:
+            page_query = query if last is None else query.start_after(last)
+            archives = list(page_query.stream())
+            if not archives:
+                break
+            last = archives[0]
+            yield chat_archive.unpack(user_id, last.get("data"))
+
+        query = self._messages(user_id).order_by("timestamp").limit(page_size)
+        last = None
+        while True:
+            page_query = query if last is None else query.start_after(last)
+            snapshots = list(page_query.stream())
+            if snapshots:
+                yield [msg.to_dict() for msg in snapshots]
+            if len(snapshots) < page_size:
+                return
+            last = snapshots[-1]
+
+    def recent(self, user_id, limit, exclude_id=None):
+        """Últimos mensajes del más antiguo al más reciente"""
+        recent_messages = (
+            self._messages(user_id)
+            .order_by("timestamp", direction=DESCENDING)
+            .limit(limit)
+            .stream()
+        )
+        messages = [msg.to_dict() for msg in recent_messages if msg.id != exclude_id]
+        messages.reverse()
+        return messages
+
+    def get_summary(self, user_id):
+        doc = self._conversation(user_id).get()
+        data = doc.to_dict() if doc.exists else {}
+        return {
+            "summary": data.get("summary", ""),
+            "summary_until": data.get("summary_until"),
+        }
+
+    def set_summary(self, user_id, summary):
+        self._conversation(user_id).set(summary, merge=True)
+
+    def clear(self, user_id, max_docs=None, progress=None):
+        """Borra mensajes y archivos por lotes y devuelve cuántos documentos se borraron"""
+        deleted = delete_in_batches(
+            self.db,
+            self._messages(user_id),
+            max_in_flight=self.max_in_flight,
+            max_docs=max_docs,
+            progress=progress,
+        )
+        if max_docs is not None and deleted >= max_docs:
+            return deleted
+        already_deleted = deleted
+        return already_deleted + delete_in_batches(
+            self.db,
+            self._archive(user_id),
+            max_in_flight=self.max_in_flight,
+            max_docs=None if max_docs is None else max_docs - already_deleted,
+            progress=progress and (lambda count: progress(already_deleted + count)),
+        )
+
+    def user_ids(self):
+        # list_documents incluye las conversaciones sin documento propio
+        return [ref.id for ref in self.db.collection("conversaciones").list_documents()]
+
+    def timestamp_at(self, user_id, index):
+        """Timestamp del mensaje vivo número `index` empezando por el más reciente"""
+        rows = list(
+            self._messages(user_id)
+            .order_by("timestamp", direction=DESCENDING)
+            .select(["timestamp"])
+            .limit(index + 1)
+            .stream()
+        )
+        return rows[index].get("timestamp") if len(rows) > index else None
+
+    def oldest_before(self, user_id, cutoff, limit):
+        """[(id, mensaje)] de los mensajes vivos anteriores a `cutoff`, en orden"""
+        query = (
+            self._messages(user_id)
+            .where("timestamp", "<", cutoff)
+            .order_by("timestamp")
+            .limit(limit)
+        )
+        return [(msg.id, msg.to_dict()) for msg in query.stream()]
+
+    def newest_archive(self, user_id):
+        query = self._archive(user_id).order_by("first", direction=DESCENDING)
+        for archive in query.limit(1).stream():
+            return archive.id, chat_archive.unpack(user_id, archive.get("data"))
+        return None
+
+    def write_archive(self, user_id, archive_id, messages, delete_ids):
+        """Guarda el archivo y borra sus mensajes vivos en un solo lote"""
+        archive_id = archive_id or f"{to_micros(messages[0]['timestamp']):020d}"
+        batch = self.db.batch()
+        batch.set(
+            self._archive(user_id).document(archive_id),
+            {
+                "first": messages[0]["timestamp"],
+                "last": messages[-1]["timestamp"],
+                "count": len(messages),
+                "data": chat_archive.pack(messages),
+            },
+        )
+        for message_id in delete_ids:
+            batch.delete(self._messages(user_id).document(message_id))
+        batch.commit()
+
+    def delete_conversation(self, user_id):
+        self._conversation(user_id).delete()
+
+
+class FirestorePsychologistRepository:
+    def __init__(self, db):
+        self.db = db
+
+    def list(self):
+        psicologos_list = []
+        for psicologo in self.db.collection("psicologos").stream():
+            psicologo_data = psicologo.to_dict()
+            psicologo_data["id"] = psicologo.id
+            psicologos_list.append(psicologo_data)
+        return psicologos_list
+
+    def create(self, psicologo_data):
+        _, doc_ref = self.db.collection("psicologos").add(psicologo_data)
+        return doc_ref.id
+
+    def delete(self, psicologo_id):
+        self.db.collection("psicologos").document(psicologo_id).delete()
+
+
+class FirestoreStorage:
+    def __init__(self, db, max_in_flight=4, tombstone_days=90):
+        self.db = db
+        self.notes = FirestoreNoteRepository(db, tombstone_days)
+        self.chat = FirestoreChatRepository(db, max_in_flight)
+        self.psychologists = FirestorePsychologistRepository(db)
+
+
+# --- SQLite ------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notas (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT '',
+    emotion_name TEXT NOT NULL DEFAULT '',
+    emotion_emoji TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    updated_at INTEGER NOT NULL DEFAULT 0
+);
+-- Índice cubriente: calendario y analíticas se resuelven sin leer la tabla
+CREATE INDEX IF NOT EXISTS notas_email_timestamp
+    ON notas (email, timestamp, emotion_name, emotion_emoji);
+CREATE INDEX IF NOT EXISTS notas_email_updated ON notas (email, updated_at, id);
+
+-- Notas borradas, para que la sincronización incremental las notifique
+CREATE TABLE IF NOT EXISTS notas_borradas (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notas_borradas_email_updated
+    ON notas_borradas (email, updated_at, id);
+
+CREATE TABLE IF NOT EXISTS mensajes (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    is_user_message INTEGER NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mensajes_user_timestamp ON mensajes (user_id, timestamp);
+
+-- Mensajes antiguos agrupados y comprimidos (chat_archive.py)
+CREATE TABLE IF NOT EXISTS mensajes_archivo (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    first REAL NOT NULL,
+    last REAL NOT NULL,
+    count INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mensajes_archivo_user_first
+    ON mensajes_archivo (user_id, first);
+
+CREATE TABLE IF NOT EXISTS conversaciones (
+    user_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '',
+    summary_until REAL
+);
+
+CREATE TABLE IF NOT EXISTS psicologos (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL DEFAULT '',
+    especialidad TEXT NOT NULL DEFAULT '',
+    telefonoCelular TEXT NOT NULL DEFAULT '',
+    telefonoOficina TEXT NOT NULL DEFAULT '',
+    correoElectronico TEXT NOT NULL DEFAULT '',
+    direccion TEXT NOT NULL DEFAULT '',
+    ubicacionUrl TEXT NOT NULL DEFAULT '',
+    fotoUrl TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+def _to_seconds(timestamp):
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+def _to_datetime(seconds):
+    if seconds is None:
+        return None
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def _new_id():
+    return uuid.uuid4().hex[:20]
+
+
+class SqliteDatabase:
+    """
+    Una conexión por hilo, reutilizada entre peticiones. WAL permite que las
+    lecturas no esperen a las escrituras.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        directory = os.path.dirname(os.path.abspath(path))
+        if not path.startswith("file:"):
+            os.makedirs(directory, exist_ok=True)
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                uri=self.path.startswith("file:"),
+                timeout=5,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def execute(self, sql, params=()):
+        conn = self.connection()
+        with conn:
+            return conn.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        conn = self.connection()
+        with conn:
+            return conn.executemany(sql, rows)
+
+    def transaction(self, statements):
+        """Ejecuta varias sentencias ((sql, parámetros), ...) de forma atómica"""
+        conn = self.connection()
+        with conn:
+            for sql, params in statements:
+                conn.execute(sql, params)
+
+    @contextmanager
+    def _begin(self, statement):
+        conn = self.connection()
+        conn.execute(statement)
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def immediate(self):
+        """
+        Transacción que toma el bloqueo de escritura al empezar: lo leído dentro
+        no cambia hasta el commit, y los commits quedan en el orden de las lecturas
+        """
+        return self._begin("BEGIN IMMEDIATE")
+
+    def snapshot(self):
+        """Varias lecturas sobre la misma instantánea (WAL), sin bloquear escritores"""
+        return self._begin("BEGIN")
+
+
+class SqliteNoteRepository:
+    def __init__(self, database, tombstone_days=90):
+        self.database = database
+        self.tombstone_days = tombstone_days
+
+    def _to_dict(self, row):
+        note_data = dict(row)
+        note_data["timestamp"] = _to_datetime(note_data["timestamp"])
+        # 0: nota anterior a updated_at, como los documentos de Firestore sin el campo
+        updated_at = note_data.pop("updated_at")
+        if updated_at:
+            note_data["updated_at"] = from_micros(updated_at)
+        return note_data
+
+    def page(self, email, page_size, before=None):
+        if before is None:
+            rows = self.database.query(
+                "SELECT * FROM notas WHERE email = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (email, page_size),
+            )
+        else:
+            timestamp, note_id = _to_seconds(before[0]), before[1]
+            rows = self.database.query(
+                # Sin id (cursores antiguos) id < '' no deja pasar ningún empate
+                "SELECT * FROM notas WHERE email = ? AND timestamp <= ? AND "
+                "(timestamp < ? OR id < ?) ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (email, timestamp, timestamp, note_id or "", page_size),
+            )
+        return [self._to_dict(row) for row in rows]
+
+    def iter_pages(self, email, page_size):
+        """Todas las notas de la más antigua a la más reciente, por (timestamp, id)"""
+        rows = self.database.query(
+            "SELECT * FROM notas WHERE email = ? ORDER BY timestamp, id LIMIT ?",
+            (email, page_size),
+        )
+        while rows:
+            yield [self._to_dict(row) for row in rows]
+            if len(rows) < page_size:
+                return
+            timestamp, note_id = rows[-1]["timestamp"], rows[-1]["id"]
+            rows = self.database.query(
+                # timestamp >= ? delimita el rango del índice; con solo el OR
+                # cada página recorrería todas las notas del usuario
+                "SELECT * FROM notas WHERE email = ? AND timestamp >= ? AND "
+                "(timestamp > ? OR id > ?) ORDER BY timestamp, id LIMIT ?",
+                (email, timestamp, timestamp, note_id, page_size),
+            )
+
+    def list_all(self, email):
+        rows = self.database.query(
+            "SELECT * FROM notas WHERE email = ? ORDER BY timestamp DESC", (email,)
+        )
+        return [self._to_dict(row) for row in rows]
+
+    def emotion_samples(self, email):
+        rows = self.database.query(
+            "SELECT COALESCE(NULLIF(emotion_name, ''), emotion_emoji), timestamp "
+            "FROM notas WHERE email = ?",
+            (email,),
+        )
+        return [row[0] for row in rows], [row[1] for row in rows]
+
+    def get(self, note_id):
+        rows = self.database.query("SELECT * FROM notas WHERE id = ?", (note_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    def _next_stamp(self, conn, email, now):
+        """
+        updated_at del siguiente cambio del usuario, leído con el bloqueo de
+        escritura tomado: nunca menor que el último confirmado, así que un
+        commit posterior no puede quedar detrás de un token ya entregado
+        aunque el reloj retroceda o dos escritores lean la hora a la vez
+        """
+        row = conn.execute(
+            "SELECT MAX(updated_at) FROM ("
+            "SELECT MAX(updated_at) AS updated_at FROM notas WHERE email = ? "
+            "UNION ALL "
+            "SELECT MAX(updated_at) FROM notas_borradas WHERE email = ?)",
+            (email, email),
+        ).fetchone()
+        return max(to_micros(now), (row[0] or 0) + 1)
+
+    def create(self, note_data):
+        note_id = _new_id()
+        now = datetime.now(timezone.utc)
+        with self.database.immediate() as conn:
+            conn.execute(
+                "INSERT INTO notas (id, email, title, content, emotion_name, "
+                "emotion_emoji, timestamp, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    note_id,
+                    note_data["email"],
+                    note_data.get("title", ""),
+                    note_data.get("content", ""),
+                    note_data.get("emotion_name", ""),
+                    note_data.get("emotion_emoji", ""),
+                    _to_seconds(note_data.get("timestamp")) or now.timestamp(),
+                    self._next_stamp(conn, note_data["email"], now),
+                ),
+            )
+        return note_id
+
+    def delete(self, note):
+        now = datetime.now(timezone.utc)
+        expired = now - timedelta(days=self.tombstone_days)
+        with self.database.immediate() as conn:
+            # Antes del DELETE: la marca debe quedar por delante de la propia nota
+            stamp = self._next_stamp(conn, note["email"], now)
+            conn.execute("DELETE FROM notas WHERE id = ?", (note["id"],))
+            conn.execute(
+                "INSERT OR REPLACE INTO notas_borradas (id, email, updated_at) "
+                "VALUES (?, ?, ?)",
+                (note["id"], note["email"], stamp),
+            )
+            # Las marcas caducadas ya no las pide ningún token válido
+            conn.execute(
+                "DELETE FROM notas_borradas WHERE email = ? AND updated_at < ?",
+                (note["email"], to_micros(expired)),
+            )
+
+    def _changed_since(self, conn, table, email, since, limit):
+        micros = to_micros(since[0])
+        rows = conn.execute(
+            f"SELECT * FROM {table} WHERE email = ? AND updated_at >= ? AND "
+            "(updated_at > ? OR id > ?) ORDER BY updated_at, id LIMIT ?",
+            (email, micros, micros, since[1], limit + 1),
+        ).fetchall()
+        changed = []
+        for row in rows[:limit]:
+            data = self._to_dict(row) if table == "notas" else dict(row)
+            changed.append(((from_micros(row["updated_at"]), row["id"]), data))
+        return changed, len(rows) > limit
+
+    def changes(self, email, since, limit):
+        # Las dos lecturas en la misma instantánea: un cambio confirmado entre
+        # ambas podría quedar por detrás del token devuelto
+        with self.database.snapshot() as conn:
+            notes = self._changed_since(conn, "notas", email, since, limit)
+            tombstones = self._changed_since(
+                conn, "notas_borradas", email, since, limit
+            )
+        return merge_changes(notes, tombstones, since, limit)
+
+    def calendar(self, email, start=None, end=None):
+        """
+        Emoji de la última nota de cada día, calculado con el índice
+        (email, timestamp); no hace falta materializarlo como en Firestore.
+        """
+        low, high = 0, float("inf")
+        if start and end:
+            low = datetime.strptime(start, "%Y-%m").replace(tzinfo=timezone.utc)
+            last = datetime.strptime(end, "%Y-%m").replace(tzinfo=timezone.utc)
+            high = (last + timedelta(days=32)).replace(day=1)
+            low, high = low.timestamp(), high.timestamp()
+
+        # SQLite toma emotion_emoji de la fila con el MAX(timestamp) de cada grupo
+        rows = self.database.query(
+            "SELECT strftime('%Y-%m-%d', timestamp, 'unixepoch') AS day, "
+            "emotion_emoji, MAX(timestamp) FROM notas "
+            "WHERE email = ? AND timestamp >= ? AND timestamp < ? GROUP BY day",
+            (email, low, high),
+        )
+        return {row["day"]: row["emotion_emoji"] for row in rows}
+
+
+class SqliteChatRepository:
+    def __init__(self, database, batch_size=500):
+        self.database = database
+        self.batch_size = batch_size
+
+    def _to_dict(self, row):
+        return {
+            "user_id": row["user_id"],
+            "text": row["text"],
+            "is_user_message": bool(row["is_user_message"]),
+            "timestamp": _to_datetime(row["timestamp"]),
+        }
+
+    def new_id(self, user_id):
+        return _new_id()
+
+    def add(self, user_id, message_data, message_id=None):
+        self.database.execute(
+            "INSERT INTO mensajes (id, user_id, text, is_user_message, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                message_id or _new_id(),
+                user_id,
+                message_data["text"],
+                int(message_data["is_user_message"]),
+                _to_seconds(message_data["timestamp"]),
+            ),
+        )
+
+    def page(self, user_id, page_size, before=None):
+        if before is None:
+            rows = self.database.query(
+                "SELECT * FROM mensajes WHERE user_id = ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (user_id, page_size),
+            )
+        else:
+            rows = self.database.query(
+                "SELECT * FROM mensajes WHERE user_id = ? AND timestamp < ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (user_id, _to_seconds(before), page_size),
+            )
+        messages = [self._to_dict(row) for row in rows]
+        if len(messages) < page_size:
+            oldest = messages[-1]["timestamp"] if messages else before
+            messages += self._archived_page(user_id, page_size - len(messages), oldest)
+        return messages
+
+    def _archived_page(self, user_id, page_size, before):
+        rows = self.database.query(
+            "SELECT data FROM mensajes_archivo WHERE user_id = ? AND first < ? "
+            "ORDER BY first DESC LIMIT ?",
+            (user_id, _to_seconds(before) if before else float("inf"), page_size),
+        )
+        messages = []
+        for row in rows:
+            archived = chat_archive.unpack(user_id, row["data"])
+            messages += [
+                msg
+                for msg in reversed(archived)
+                if before is None or msg["timestamp"] < before
+            ]
+            if len(messages) >= page_size:
+                break
+        return messages[:page_size]
+
+    def iter_pages(self, user_id, page_size):
+        """Archivos y después mensajes vivos, del más antiguo al más reciente"""
+        # Un archivo por consulta: cada uno ya trae cientos de mensajes
+        rows = self.database.query(
+            "SELECT id, first, data FROM mensajes_archivo WHERE user_id = ? "
+            "ORDER BY first, id LIMIT 1",
+            (user_id,),
+        )
+        while rows:
+            yield chat_archive.unpack(user_id, rows[0]["data"])
+            first, archive_id = rows[0]["first"], rows[0]["id"]
+            rows = self.database.query(
+                "SELECT id, first, data FROM mensajes_archivo WHERE user_id = ? "
+                "AND first >= ? AND (first > ? OR id > ?) ORDER BY first, id LIMIT 1",
+                (user_id, first, first, archive_id),
+            )
+
+        rows = self.database.query(
+            "SELECT * FROM mensajes WHERE user_id = ? ORDER BY timestamp, id LIMIT ?",
+            (user_id, page_size),
+        )
+        while rows:
+            yield [self._to_dict(row) for row in rows]
+            if len(rows) < page_size:
+                return
+            timestamp, message_id = rows[-1]["timestamp"], rows[-1]["id"]
+            rows = self.database.query(
+                "SELECT * FROM mensajes WHERE user_id = ? AND timestamp >= ? AND "
+                "(timestamp > ? OR id > ?) ORDER BY timestamp, id LIMIT ?",
+                (user_id, timestamp, timestamp, message_id, page_size),
+            )
+
+    def recent(self, user_id, limit, exclude_id=None):
+        rows = self.database.query(
+            "SELECT * FROM mensajes WHERE user_id = ? AND id != ? "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (user_id, exclude_id or "", limit),
+        )
+        messages = [self._to_dict(row) for row in rows]
+        messages.reverse()
+        return messages
+
+    def get_summary(self, user_id):
+        rows = self.database.query(
+            "SELECT summary, summary_until FROM conversaciones WHERE user_id = ?",
+            (user_id,),
+        )
+        if not rows:
+            return {"summary": "", "summary_until": None}
+        return {
+            "summary": rows[0]["summary"],
+            "summary_until": _to_datetime(rows[0]["summary_until"]),
+        }
+
+    def set_summary(self, user_id, summary):
+        self.database.execute(
+            "INSERT INTO conversaciones (user_id, summary, summary_until) "
+            "VALUES (?, ?, ?) ON CONFLICT (user_id) DO UPDATE SET "
+            "summary = excluded.summary, summary_until = excluded.summary_until",
+            (user_id, summary["summary"], _to_seconds(summary["summary_until"])),
+        )
+
+    def clear(self, user_id, max_docs=None, progress=None):
+        # Por lotes para no bloquear a los escritores durante un borrado largo
+        deleted = 0
+        while max_docs is None or deleted < max_docs:
+            limit = self.batch_size
+            if max_docs is not None:
+                limit = min(limit, max_docs - deleted)
+            cursor = self.database.execute(
+                "DELETE FROM mensajes WHERE id IN "
+                "(SELECT id FROM mensajes WHERE user_id = ? LIMIT ?)",
+                (user_id, limit),
+            )
+            deleted += cursor.rowcount
+            if progress:
+                progress(deleted)
+            if cursor.rowcount < limit:
+                break
+        if max_docs is None or deleted < max_docs:
+            cursor = self.database.execute(
+                "DELETE FROM mensajes_archivo WHERE user_id = ?", (user_id,)
+            )
+            deleted += cursor.rowcount
+        return deleted
+
+    def user_ids(self):
+        rows = self.database.query("SELECT DISTINCT user_id FROM mensajes")
+        return [row["user_id"] for row in rows]
+
+    def timestamp_at(self, user_id, index):
+        rows = self.database.query(
+            "SELECT timestamp FROM mensajes WHERE user_id = ? "
+            "ORDER BY timestamp DESC LIMIT 1 OFFSET ?",
+            (user_id, index),
+        )
+        return _to_datetime(rows[0]["timestamp"]) if rows else None
+
+    def oldest_before(self, user_id, cutoff, limit):
+        rows = self.database.query(
+            "SELECT * FROM mensajes WHERE user_id = ? AND timestamp < ? "
+            "ORDER BY timestamp LIMIT ?",
+            (user_id, _to_seconds(cutoff), limit),
+        )
+        return [(row["id"], self._to_dict(row)) for row in rows]
+
+    def newest_archive(self, user_id):
+        rows = self.database.query(
+            "SELECT id, data FROM mensajes_archivo WHERE user_id = ? "
+            "ORDER BY first DESC LIMIT 1",
+            (user_id,),
+        )
+        if not rows:
+            return None
+        return rows[0]["id"], chat_archive.unpack(user_id, rows[0]["data"])
+
+    def write_archive(self, user_id, archive_id, messages, delete_ids):
+        self.database.transaction(
+            [
+                (
+                    "INSERT OR REPLACE INTO mensajes_archivo "
+                    "(id, user_id, first, last, count, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        archive_id or _new_id(),
+                        user_id,
+                        _to_seconds(messages[0]["timestamp"]),
+                        _to_seconds(messages[-1]["timestamp"]),
+                        len(messages),
+                        chat_archive.pack(messages),
+                    ),
+                ),
+                (
+                    f"DELETE FROM mensajes WHERE id IN ({', '.join('?' * len(delete_ids))})",
+                    list(delete_ids),
+                ),
+            ]
+        )
+
+    def delete_conversation(self, user_id):
+        self.database.execute(
+            "DELETE FROM conversaciones WHERE user_id = ?", (user_id,)
+        )
+
+
+class SqlitePsychologistRepository:
+    def __init__(self, database):
+        self.database = database
+
+    def list(self):
+        rows = self.database.query("SELECT * FROM psicologos ORDER BY rowid")
+        return [dict(row) for row in rows]
+
+    def create(self, psicologo_data):
+        psicologo_id = _new_id()
+        self.database.execute(
+            f"INSERT INTO psicologos (id, {', '.join(PSYCHOLOGIST_FIELDS)}) "
+            f"VALUES (?{', ?' * len(PSYCHOLOGIST_FIELDS)})",
+            [psicologo_id]
+            + [psicologo_data.get(field, "") for field in PSYCHOLOGIST_FIELDS],
+        )
+        return psicologo_id
+
+    def delete(self, psicologo_id):
+        self.database.execute("DELETE FROM psicologos WHERE id = ?", (psicologo_id,))
+
+
+class SqliteStorage:
+    def __init__(self, path, tombstone_days=90):
+        self.database = SqliteDatabase(path)
+        self.notes = SqliteNoteRepository(self.database, tombstone_days)
+        self.chat = SqliteChatRepository(self.database)
+        self.psychologists = SqlitePsychologistRepository(self.database)
+
+
+def create_storage(config, get_firestore):
+    """Elige la implementación según STORAGE_BACKEND ("firestore" o "sqlite")"""
+    if config["STORAGE_BACKEND"] == "sqlite":
+        log.info("storage_initialized", backend="sqlite", path=config["SQLITE_PATH"])
+        return SqliteStorage(config["SQLITE_PATH"], config["NOTES_TOMBSTONE_DAYS"])
+
+    db = get_firestore()
+    if db is None:
+        return None
+    return FirestoreStorage(
+        db, config["DELETE_MAX_IN_FLIGHT"], config["NOTES_TOMBSTONE_DAYS"]
+    )
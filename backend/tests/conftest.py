@@ -0,0 +1,51 @@
+"""
+Fixtures de las pruebas: la app con Firestore en memoria (fakes.py) o con
+SQLite en un directorio temporal, sin credenciales ni red
+"""
+import os
+import sys
+import uuid
+
+import pytest
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend
+from fakes import FakeFirestore, FakeGeminiModel, fake_verify_token
+from storage import FirestoreStorage, SqliteStorage
+
+
+@pytest.fixture(params=["firestore", "sqlite"])
+def storage(request, tmp_path, monkeypatch):
+    db = FakeFirestore()
+    backend.services.firebase.set(db)
+    backend.services.gemini.set(backend.services.gemini_guard.wrap(FakeGeminiModel(0)))
+    if request.param == "sqlite":
+        repository = SqliteStorage(str(tmp_path / "zenith.db"))
+    else:
+        repository = FirestoreStorage(db)
+    backend.services.storage.set(repository)
+    monkeypatch.setattr(backend, "verify_token", fake_verify_token)
+    return repository
+
+
+@pytest.fixture
+def client(storage):
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def uid():
+    # Un usuario nuevo por prueba: las cachés en memoria van por usuario
+    return f"user-{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture
+def headers(uid):
+    return {"Authorization": f"Bearer {uid}"}
+
+
+@pytest.fixture
+def email(uid):
+    return fake_verify_token(uid)["email"]
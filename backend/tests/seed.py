@@ -0,0 +1,80 @@
+"""Datos de prueba escritos directamente en el almacenamiento"""
+import json
+from datetime import datetime, timedelta, timezone
+
+from storage import SqliteStorage
+from timestamps import to_micros
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def add_messages(storage, uid, count, start=BASE_TIME):
+    """`count` mensajes separados por un segundo; devuelve sus textos en orden"""
+    texts = []
+    for index in range(count):
+        text = f"Mensaje {index}"
+        storage.chat.add(
+            uid,
+            {
+                "user_id": uid,
+                "text": text,
+                "is_user_message": index % 2 == 0,
+                "timestamp": start + timedelta(seconds=index),
+            },
+        )
+        texts.append(text)
+    return texts
+
+
+def add_note(storage, email, note_id, timestamp, updated_at=None, emoji=""):
+    """Nota con timestamp y updated_at fijos, escrita sin pasar por la app"""
+    updated_at = updated_at or timestamp
+    if isinstance(storage, SqliteStorage):
+        storage.database.execute(
+            "INSERT INTO notas (id, email, title, emotion_emoji, timestamp, "
+            "updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                note_id,
+                email,
+                note_id,
+                emoji,
+                timestamp.timestamp(),
+                to_micros(updated_at),
+            ),
+        )
+        return
+    storage.db.collection("notas").document(note_id).set(
+        {
+            "email": email,
+            "title": note_id,
+            "content": "",
+            "emotion_name": "",
+            "emotion_emoji": emoji,
+            "timestamp": timestamp,
+            "updated_at": updated_at,
+        }
+    )
+
+
+def collect(client, headers, path, key):
+    """Recorre todas las páginas siguiendo next_cursor"""
+    items, cursor, pages = [], None, 0
+    while True:
+        url = path if cursor is None else f"{path}&cursor={cursor}"
+        body = client.get(url, headers=headers).get_json()
+        items.append(body[key])
+        cursor = body["next_cursor"]
+        pages += 1
+        if cursor is None or pages > 50:
+            return items
+
+
+def sse_events(response):
+    """[(evento, datos)] de una respuesta text/event-stream"""
+    parsed = []
+    for raw in response.get_data(as_text=True).split("\n\n"):
+        if raw:
+            event, data = raw.split("\n", 1)
+            assert event.startswith("event: ") and data.startswith("data: ")
+            parsed.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return parsed
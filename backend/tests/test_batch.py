@@ -0,0 +1,90 @@
+import pytest
+
+import app as backend
+from models import Emotion
+from seed import BASE_TIME, add_messages, add_note
+
+
+def batch(client, headers, requests):
+    return client.post("/api/batch", headers=headers, json={"requests": requests})
+
+
+def test_batch_answers_each_read_in_order(client, storage, uid, email, headers):
+    add_note(storage, email, "note-1", BASE_TIME)
+    texts = add_messages(storage, uid, 2)
+
+    response = batch(
+        client,
+        headers,
+        [
+            {"id": "emotions", "path": "/api/emotions"},
+            {"id": "notes", "path": "/api/notes"},
+            {"path": "/api/chat/history?limit=10"},
+        ],
+    )
+
+    assert response.status_code == 200
+    emotions, notes, history = response.get_json()["responses"]
+    assert emotions == {"id": "emotions", "status": 200, "body": Emotion.get_all()}
+    assert notes["id"] == "notes" and notes["status"] == 200
+    assert [note["id"] for note in notes["body"]["notes"]] == ["note-1"]
+    # Sin id, cada subpetición se identifica por su posición
+    assert history["id"] == "2"
+    assert [msg["text"] for msg in history["body"]] == texts
+
+
+def test_batch_item_errors_do_not_fail_the_batch(client, headers):
+    response = batch(
+        client,
+        headers,
+        [
+            {"id": "missing", "path": "/api/nope"},
+            {"id": "export", "path": "/api/export"},
+            {"id": "bad", "path": "/api/chat/history?page_size=x"},
+            {"id": "tips", "path": "/api/tips"},
+        ],
+    )
+
+    assert response.status_code == 200
+    statuses = {item["id"]: item["status"] for item in response.get_json()["responses"]}
+    assert statuses == {"missing": 404, "export": 400, "bad": 400, "tips": 200}
+
+
+def test_batch_reuses_the_callers_token(client, storage):
+    response = batch(client, {}, [{"path": "/api/notes"}])
+    assert response.status_code == 401
+
+    other = batch(client, {"Authorization": "Bearer someone"}, [{"path": "/api/notes"}])
+    assert other.get_json()["responses"][0]["status"] == 200
+
+
+@pytest.mark.parametrize(
+    "payload,error",
+    [
+        ({}, "'requests' must be a non-empty list"),
+        ({"requests": []}, "'requests' must be a non-empty list"),
+        ({"requests": [{"id": "x"}]}, "Request 0 needs a 'path'"),
+        (
+            {"requests": [{"path": "/api/notes", "method": "POST"}]},
+            "Only GET requests can be batched",
+        ),
+        (
+            {"requests": [{"path": "http://example.com/"}]},
+            "Invalid path: http://example.com/",
+        ),
+    ],
+)
+def test_batch_rejects_malformed_bodies(client, headers, payload, error):
+    response = client.post("/api/batch", headers=headers, json=payload)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+
+
+def test_batch_size_is_capped(client, headers, monkeypatch):
+    monkeypatch.setitem(backend.app.config, "BATCH_MAX_REQUESTS", 2)
+
+    response = batch(client, headers, [{"path": "/api/tips"}] * 3)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "At most 2 requests per batch"}
@@ -0,0 +1,137 @@
+import pytest
+
+import app as backend
+import gemini_client
+from gemini_client import CircuitBreaker, GeminiGuard, GeminiUnavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gemini_client.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_after_threshold_and_rejects_until_cooldown(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 10
+    assert not breaker.allow()
+    assert breaker.retry_after() == pytest.approx(20)
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 30
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_again(clock):
+    breaker = CircuitBreaker(threshold=5, cooldown=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 31
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock[0] += 30
+    assert breaker.allow()
+
+
+def test_guard_is_healthy_only_while_closed(clock):
+    guard = GeminiGuard(breaker_threshold=1, breaker_cooldown=30)
+    assert guard.healthy()
+
+    guard.breaker.record_failure()
+    assert not guard.healthy()
+
+    clock[0] += 30
+    guard.breaker.allow()
+    assert not guard.healthy()
+    guard.breaker.record_success()
+    assert guard.healthy()
+
+
+class ServiceUnavailable(Exception):
+    """Se llama como la de google.api_core: cuenta como error transitorio"""
+
+
+class FlakyModel:
+    def __init__(self, failures, error=ServiceUnavailable):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("fallo")
+        return "ok"
+
+
+def guard_without_backoff(**kwargs):
+    return GeminiGuard(backoff=0, **kwargs)
+
+
+def test_transient_errors_are_retried():
+    model = FlakyModel(failures=2)
+    guarded = guard_without_backoff(max_retries=2).wrap(model)
+
+    assert guarded.generate_content("hola") == "ok"
+    assert model.calls == 3
+
+
+def test_exhausted_retries_count_as_one_breaker_failure():
+    guard = guard_without_backoff(max_retries=1, breaker_threshold=2)
+    model = FlakyModel(failures=10)
+
+    with pytest.raises(GeminiUnavailable):
+        guard.wrap(model).generate_content("hola")
+
+    assert model.calls == 2
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+    assert guard.in_flight == 0
+
+
+def test_client_errors_are_not_retried_or_counted():
+    guard = guard_without_backoff(breaker_threshold=1)
+    model = FlakyModel(failures=1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        guard.wrap(model).generate_content("hola")
+
+    assert model.calls == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_breaker_answers_503_with_retry_after(
+    client, storage, headers, monkeypatch
+):
+    guard = guard_without_backoff(breaker_threshold=1, breaker_cooldown=30)
+    monkeypatch.setattr(backend.services, "gemini_guard", guard)
+    backend.services.gemini.set(guard.wrap(FlakyModel(failures=0)))
+    guard.breaker.record_failure()
+
+    response = client.post("/api/chat/send", json={"message": "Hola"}, headers=headers)
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) > 0
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+import pytest
+
+from emotion_calendar import calendar_ref
+from seed import BASE_TIME, add_note
+from storage import SqliteStorage
+
+
+def post_note(client, headers, emoji):
+    response = client.post(
+        "/api/notes", json={"title": emoji, "emotion_emoji": emoji}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.get_json()["id"]
+
+
+def calendar(client, headers):
+    return client.get("/api/calendar/emotions", headers=headers).get_json()
+
+
+def test_day_shows_latest_note_and_falls_back_on_delete(client, storage, headers):
+    first = post_note(client, headers, "😊")
+    second = post_note(client, headers, "😢")
+
+    days = calendar(client, headers)
+    assert len(days) == 1
+    [day] = days
+    assert days[day] == "😢"
+
+    client.delete(f"/api/notes/{second}", headers=headers)
+    assert calendar(client, headers) == {day: "😊"}
+
+    client.delete(f"/api/notes/{first}", headers=headers)
+    assert calendar(client, headers) == {}
+
+
+def test_deleting_an_older_note_keeps_the_latest(client, storage, headers):
+    first = post_note(client, headers, "😊")
+    post_note(client, headers, "😢")
+
+    client.delete(f"/api/notes/{first}", headers=headers)
+
+    assert list(calendar(client, headers).values()) == ["😢"]
+
+
+def test_backfill_rebuilds_the_calendar_from_existing_notes(
+    client, storage, email, headers
+):
+    if isinstance(storage, SqliteStorage):
+        pytest.skip("SQLite calcula el calendario en cada lectura")
+    # Notas escritas sin pasar por la app: aún no hay calendario materializado
+    add_note(storage, email, "a", BASE_TIME, emoji="😊")
+    add_note(storage, email, "b", BASE_TIME + timedelta(hours=1), emoji="😢")
+    add_note(storage, email, "c", BASE_TIME + timedelta(days=40), emoji="😐")
+
+    assert calendar(client, headers) == {
+        "2026-01-01": "😢",
+        "2026-02-10": "😐",
+    }
+    # Los meses quedan guardados: la segunda lectura no vuelve a reconstruir
+    assert calendar_ref(storage.db, email).get().exists
+    post_note(client, headers, "😴")
+    assert len(calendar(client, headers)) == 3
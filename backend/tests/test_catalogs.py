@@ -0,0 +1,69 @@
+import gzip
+
+import pytest
+
+import app as backend
+from compression import ENCODINGS
+from models import CATALOG_VERSION, Consejo, Emotion
+
+CATALOGS = [("/api/emotions", Emotion.get_all()), ("/api/tips", Consejo.get_all())]
+
+
+@pytest.mark.parametrize("path,data", CATALOGS)
+def test_catalog_is_public_and_cacheable(client, path, data):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert response.get_json() == data
+    assert response.headers["Cache-Control"] == (
+        f"public, max-age={backend.app.config['CATALOG_MAX_AGE']}"
+    )
+    assert response.headers["X-Catalog-Version"] == str(CATALOG_VERSION)
+    assert response.headers["ETag"].startswith(f'"v{CATALOG_VERSION}-')
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.parametrize("path,data", CATALOGS)
+def test_catalog_answers_304_while_unchanged(client, path, data):
+    etag = client.get(path).headers["ETag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+
+
+def decompress(body, encoding):
+    if encoding == "br":
+        import brotli
+
+        return brotli.decompress(body)
+    return gzip.decompress(body)
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_catalog_serves_precompressed_variants(client, encoding):
+    identity = client.get("/api/emotions")
+    response = client.get("/api/emotions", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert decompress(response.get_data(), encoding) == identity.get_data()
+    # Cada variante tiene su propio ETag, y un 304 solo vale para la suya
+    etag = response.headers["ETag"]
+    assert etag != identity.headers["ETag"]
+    assert (
+        client.get(
+            "/api/emotions",
+            headers={"Accept-Encoding": encoding, "If-None-Match": etag},
+        ).status_code
+        == 304
+    )
+
+
+def test_catalog_is_served_from_the_startup_bytes(client, monkeypatch):
+    emotions = Emotion.get_all()
+    # El modelo no se vuelve a consultar por petición
+    monkeypatch.setattr(Emotion, "EMOTIONS", [])
+
+    assert client.get("/api/emotions").get_json() == emotions
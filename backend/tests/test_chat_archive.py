@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import chat_archive
+from seed import BASE_TIME, add_messages, collect
+
+
+def test_history_pages_span_archives_and_live_messages(client, storage, uid, headers):
+    texts = add_messages(storage, uid, 40)
+    # 25 mensajes archivados en documentos de 10 y los 15 últimos en vivo
+    archived, written = chat_archive.compact(
+        storage.chat, uid, BASE_TIME + timedelta(seconds=25), chunk_size=10
+    )
+    assert (archived, written) == (25, 3)
+
+    pages = collect(client, headers, "/api/chat/history?page_size=7", "messages")
+
+    seen = [msg["text"] for page in reversed(pages) for msg in page]
+    assert seen == texts
+
+
+def test_iter_pages_reads_archives_in_order(storage, uid):
+    texts = add_messages(storage, uid, 30)
+    chat_archive.compact(
+        storage.chat, uid, BASE_TIME + timedelta(seconds=12), chunk_size=5
+    )
+
+    seen = [msg["text"] for page in storage.chat.iter_pages(uid, 4) for msg in page]
+
+    assert seen == texts
+
+
+def test_compaction_resumes_the_last_archive(storage, uid):
+    add_messages(storage, uid, 12)
+    chat_archive.compact(storage.chat, uid, BASE_TIME + timedelta(seconds=3), 10)
+
+    archived, written = chat_archive.compact(
+        storage.chat, uid, BASE_TIME + timedelta(seconds=10), 10
+    )
+
+    # Los 7 siguientes completan el primer archivo (3 + 7) sin abrir otro
+    assert (archived, written) == (7, 1)
+
+
+def test_pack_keeps_microsecond_timestamps():
+    messages = [
+        {
+            "user_id": "u",
+            "text": "hola",
+            "is_user_message": True,
+            "timestamp": BASE_TIME + timedelta(microseconds=123457),
+        }
+    ]
+
+    assert chat_archive.unpack("u", chat_archive.pack(messages)) == messages
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import app as backend
+import chat_archive
+from seed import BASE_TIME, add_messages
+
+
+def clear(client, headers):
+    return client.delete("/api/chat/clear", headers=headers)
+
+
+def test_short_history_is_cleared_in_the_request(client, storage, uid, headers):
+    add_messages(storage, uid, 5)
+    storage.chat.set_summary(uid, {"summary": "Resumen", "summary_until": BASE_TIME})
+
+    response = clear(client, headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["deleted"] == 5
+    assert storage.chat.recent(uid, 10) == []
+    assert storage.chat.get_summary(uid)["summary"] == ""
+
+
+def test_long_history_continues_in_a_background_job(
+    client, storage, uid, headers, monkeypatch
+):
+    monkeypatch.setitem(backend.app.config, "CHAT_CLEAR_SYNC_LIMIT", 4)
+    add_messages(storage, uid, 11)
+
+    response = clear(client, headers)
+
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["deleted"] == 4
+    backend.background.flush(5)
+    status = client.get(body["status_url"], headers=headers).get_json()
+    assert status["status"] == "done"
+    assert status["deleted"] == 11
+    assert storage.chat.recent(uid, 20) == []
+
+
+def test_clear_also_removes_archived_messages(client, storage, uid, headers):
+    add_messages(storage, uid, 8)
+    chat_archive.compact(storage.chat, uid, BASE_TIME + timedelta(seconds=6), 4)
+
+    clear(client, headers)
+
+    assert list(storage.chat.iter_pages(uid, 10)) == []
+
+
+def test_job_status_is_only_visible_to_its_owner(
+    client, storage, uid, headers, monkeypatch
+):
+    monkeypatch.setitem(backend.app.config, "CHAT_CLEAR_SYNC_LIMIT", 1)
+    add_messages(storage, uid, 3)
+    status_url = clear(client, headers).get_json()["status_url"]
+    backend.background.flush(5)
+
+    other = client.get(status_url, headers={"Authorization": "Bearer someone-else"})
+
+    assert other.status_code == 404
+    missing = client.get("/api/chat/clear/unknown", headers=headers)
+    assert missing.status_code == 404
@@ -0,0 +1,45 @@
+import base64
+import json
+
+from seed import add_messages, collect
+
+
+def crafted_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_chat_history_pages_cover_every_message(client, storage, uid, headers):
+    texts = add_messages(storage, uid, 23)
+
+    pages = collect(client, headers, "/api/chat/history?page_size=5", "messages")
+
+    # Cada página va del más antiguo al más reciente y las páginas hacia atrás
+    seen = [msg["text"] for page in reversed(pages) for msg in page]
+    assert seen == texts
+
+
+def test_chat_history_rejects_non_numeric_sizes(client, headers):
+    response = client.get("/api/chat/history?page_size=abc", headers=headers)
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "'page_size' must be an integer"}
+
+
+def test_chat_history_rejects_malformed_cursors(client, storage, uid, headers):
+    add_messages(storage, uid, 3)
+
+    for cursor in (
+        "not-a-cursor",
+        crafted_cursor({"ts": "2026-01-01T00:00:00"}),
+        crafted_cursor({"ts": 5}),
+    ):
+        response = client.get(f"/api/chat/history?cursor={cursor}", headers=headers)
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_chat_history_limit_is_clamped(client, storage, uid, headers):
+    texts = add_messages(storage, uid, 3)
+
+    body = client.get("/api/chat/history?limit=0", headers=headers).get_json()
+
+    assert [msg["text"] for msg in body] == texts[-1:]
@@ -0,0 +1,78 @@
+import app as backend
+from fakes import FakeGeminiModel
+from seed import sse_events
+
+
+class FailingStreamModel(FakeGeminiModel):
+    """El stream se corta con un error que no es transitorio"""
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        def chunks():
+            yield from list(
+                super(FailingStreamModel, self).generate_content(prompt, stream=True)
+            )[:1]
+            raise RuntimeError("respuesta bloqueada")
+
+        return chunks()
+
+
+def saved_texts(storage, uid):
+    backend.background.flush(5)
+    return [msg["text"] for msg in storage.chat.recent(uid, 10)]
+
+
+def test_stream_sends_chunks_then_done(client, storage, uid, headers):
+    backend.services.gemini.set(FakeGeminiModel(reply="Hola, ¿cómo estás?"))
+
+    response = client.post(
+        "/api/chat/stream", json={"message": "Hola"}, headers=headers
+    )
+
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    events = sse_events(response)
+    *chunks, (last, done) = events
+    assert {event for event, _ in chunks} == {"chunk"}
+    assert "".join(data["text"] for _, data in chunks) == "Hola, ¿cómo estás?"
+    assert last == "done" and done["response"] == "Hola, ¿cómo estás?"
+    # Sin escapar: los acentos viajan tal cual en el stream
+    assert "¿cómo" in response.get_data(as_text=True)
+    assert saved_texts(storage, uid) == ["Hola", "Hola, ¿cómo estás?"]
+
+
+def test_send_streams_when_the_client_accepts_event_stream(client, storage, headers):
+    headers = dict(headers, Accept="text/event-stream")
+
+    response = client.post("/api/chat/send", json={"message": "Hola"}, headers=headers)
+
+    assert response.mimetype == "text/event-stream"
+    assert sse_events(response)[-1][0] == "done"
+
+
+def test_send_without_event_stream_answers_json(client, storage, headers):
+    response = client.post("/api/chat/send", json={"message": "Hola"}, headers=headers)
+
+    assert response.get_json()["response"] == "Gracias por contármelo."
+
+
+def test_failure_mid_stream_ends_with_an_error_event(client, storage, uid, headers):
+    backend.services.gemini.set(FailingStreamModel())
+
+    response = client.post(
+        "/api/chat/stream", json={"message": "Hola"}, headers=headers
+    )
+
+    events = sse_events(response)
+    assert events[0][0] == "chunk"
+    assert events[-1][0] == "error"
+    assert "respuesta bloqueada" in events[-1][1]["error"]
+    assert "done" not in [event for event, _ in events]
+    # Solo se guarda el mensaje del usuario
+    assert saved_texts(storage, uid) == ["Hola"]
+
+
+def test_invalid_message_is_rejected_before_streaming(client, storage, headers):
+    response = client.post("/api/chat/stream", json={}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.is_json
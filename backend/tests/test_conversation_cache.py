@@ -0,0 +1,83 @@
+import time
+
+import app as backend
+import cache
+from seed import add_messages
+
+
+def count_reads(storage, monkeypatch):
+    reads = []
+    recent = storage.chat.recent
+
+    def counted(*args, **kwargs):
+        reads.append(args)
+        return recent(*args, **kwargs)
+
+    monkeypatch.setattr(storage.chat, "recent", counted)
+    return reads
+
+
+def send(client, headers, message):
+    response = client.post("/api/chat/send", json={"message": message}, headers=headers)
+    assert response.status_code == 200
+    backend.background.flush(5)
+
+
+def history(client, headers, limit=20):
+    body = client.get(f"/api/chat/history?limit={limit}", headers=headers).get_json()
+    return [msg["text"] for msg in body]
+
+
+def test_window_is_read_once_and_kept_up_to_date(
+    client, storage, uid, headers, monkeypatch
+):
+    add_messages(storage, uid, 3)
+    reads = count_reads(storage, monkeypatch)
+
+    send(client, headers, "uno")
+    send(client, headers, "dos")
+
+    assert len(reads) == 1
+    texts = history(client, headers)
+    assert texts[-4:] == [
+        "uno",
+        "Gracias por contármelo.",
+        "dos",
+        "Gracias por contármelo.",
+    ]
+    assert len(reads) == 1
+
+
+def test_window_keeps_the_latest_messages(client, storage, uid, headers):
+    size = backend.app.config["CHAT_WINDOW_SIZE"]
+    texts = add_messages(storage, uid, size)
+
+    send(client, headers, "nuevo")
+
+    window = backend.conversation_cache.get(uid)
+    assert len(window) == size
+    assert [msg["text"] for msg in window[:-2]] == texts[2:]
+
+
+def test_clear_invalidates_the_cached_window(client, storage, uid, headers):
+    add_messages(storage, uid, 3)
+    send(client, headers, "hola")
+    assert backend.conversation_cache.get(uid) is not None
+
+    assert client.delete("/api/chat/clear", headers=headers).status_code == 200
+
+    assert backend.conversation_cache.get(uid) is None
+    assert history(client, headers) == []
+
+
+def test_expired_window_is_read_again(client, storage, uid, headers, monkeypatch):
+    add_messages(storage, uid, 2)
+    reads = count_reads(storage, monkeypatch)
+    history(client, headers)
+    assert len(reads) == 1
+
+    now = time.time() + backend.app.config["CHAT_CACHE_TTL"]
+    monkeypatch.setattr(cache.time, "time", lambda: now)
+
+    assert history(client, headers) == ["Mensaje 0", "Mensaje 1"]
+    assert len(reads) == 2
@@ -0,0 +1,124 @@
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+
+import pytest
+
+import app as backend
+from seed import BASE_TIME, add_messages, add_note
+
+
+@pytest.fixture(autouse=True)
+def small_pages(monkeypatch):
+    # Páginas pequeñas para que la exportación recorra varias
+    monkeypatch.setitem(backend.app.config, "EXPORT_PAGE_SIZE", 2)
+
+
+def add_notes(storage, email, count):
+    for index in range(count):
+        add_note(storage, email, f"note-{index}", BASE_TIME + timedelta(hours=index))
+    return [f"note-{index}" for index in range(count)]
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_ndjson_export_lists_every_record_oldest_first(
+    client, storage, uid, email, headers
+):
+    note_ids = add_notes(storage, email, 5)
+    texts = add_messages(storage, uid, 3)
+
+    response = client.get("/api/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Cache-Control"] == "no-store"
+    assert response.headers["Content-Disposition"].startswith(
+        'attachment; filename="zenith-'
+    )
+    header, *records = ndjson(response)
+    assert header["type"] == "export"
+    assert header["email"] == email
+    assert header["include"] == ["notes", "chat"]
+    assert [r["id"] for r in records if r["type"] == "note"] == note_ids
+    assert [r["text"] for r in records if r["type"] == "message"] == texts
+    assert records[0]["timestamp"] == "2026-01-01T00:00:00+00:00"
+
+
+def test_export_include_limits_the_sections(client, storage, uid, email, headers):
+    add_notes(storage, email, 2)
+    add_messages(storage, uid, 2)
+
+    header, *records = ndjson(client.get("/api/export?include=chat", headers=headers))
+
+    assert header["include"] == ["chat"]
+    assert {record["type"] for record in records} == {"message"}
+
+
+def test_csv_export_has_a_bom_and_one_row_per_record(
+    client, storage, uid, email, headers
+):
+    add_notes(storage, email, 3)
+    add_messages(storage, uid, 2)
+
+    response = client.get("/api/export?format=csv", headers=headers)
+
+    assert response.mimetype == "text/csv"
+    body = response.get_data(as_text=True)
+    assert body.startswith("\ufeff")
+    rows = list(csv.DictReader(io.StringIO(body[1:])))
+    assert [row["type"] for row in rows] == ["note"] * 3 + ["message"] * 2
+    assert rows[0]["id"] == "note-0"
+    assert rows[0]["timestamp"] == "2026-01-01T00:00:00+00:00"
+    assert rows[3]["is_user_message"] == "true"
+    assert rows[4]["is_user_message"] == "false"
+
+
+def test_csv_export_neutralizes_formulas(client, storage, email, headers):
+    created = client.post(
+        "/api/notes",
+        headers=headers,
+        json={"title": '=HYPERLINK("http://evil")', "content": "-2+3"},
+    )
+    assert created.status_code == 201
+
+    body = client.get("/api/export?format=csv&include=notes", headers=headers)
+    (row,) = csv.DictReader(io.StringIO(body.get_data(as_text=True)[1:]))
+
+    assert row["title"] == '\'=HYPERLINK("http://evil")'
+    assert row["content"] == "'-2+3"
+
+
+def test_export_is_compressed_when_accepted(client, storage, email, headers):
+    add_notes(storage, email, 3)
+    plain = client.get("/api/export?include=notes", headers=headers)
+
+    response = client.get(
+        "/api/export?include=notes", headers={**headers, "Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    records = [
+        json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()
+    ]
+    # La cabecera lleva la hora de la exportación; los registros son los mismos
+    assert records[1:] == ndjson(plain)[1:]
+
+
+@pytest.mark.parametrize(
+    "query,error",
+    [
+        ("format=xml", "'format' must be ndjson or csv"),
+        ("include=notes,photos", "'include' must be a list of: notes, chat"),
+        ("include=,", "'include' must be a list of: notes, chat"),
+    ],
+)
+def test_export_rejects_unknown_options(client, headers, query, error):
+    response = client.get(f"/api/export?{query}", headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
@@ -0,0 +1,90 @@
+import pytest
+
+import app as backend
+import gemini_client
+from fakes import FakeGeminiModel
+from gemini_client import CircuitBreaker, GeminiGuard, GeminiUnavailable
+
+
+class ServiceUnavailable(Exception):
+    """Se llama como la de google.api_core: cuenta como error transitorio"""
+
+
+class BrokenStreamModel(FakeGeminiModel):
+    """Envía un fragmento y después falla a mitad del stream"""
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        def chunks():
+            yield from list(
+                super(BrokenStreamModel, self).generate_content(prompt, stream=True)
+            )[:1]
+            raise ServiceUnavailable("stream reset")
+
+        return chunks()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gemini_client.time, "monotonic", lambda: now[0])
+    return now
+
+
+def half_open(guard, clock):
+    guard.breaker.record_failure()
+    clock[0] += guard.breaker.cooldown
+
+
+def test_failure_mid_stream_opens_the_breaker(clock):
+    guard = GeminiGuard(breaker_threshold=1)
+    model = guard.wrap(BrokenStreamModel())
+
+    response = model.generate_content("hola", stream=True)
+    with pytest.raises(GeminiUnavailable):
+        list(response)
+
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    assert guard.in_flight == 0
+
+
+def test_probe_stream_closes_the_breaker_only_when_it_ends(clock):
+    guard = GeminiGuard(breaker_threshold=1)
+    half_open(guard, clock)
+    model = guard.wrap(FakeGeminiModel())
+
+    response = model.generate_content("hola", stream=True)
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+
+    list(response)
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_abandoned_probe_stream_lets_another_probe_through(clock):
+    guard = GeminiGuard(breaker_threshold=1)
+    half_open(guard, clock)
+    model = guard.wrap(FakeGeminiModel())
+
+    response = model.generate_content("hola", stream=True)
+    assert not guard.breaker.allow()
+    iterator = iter(response)
+    next(iterator)
+    iterator.close()
+
+    assert guard.breaker.allow()
+
+
+def test_chat_stream_reports_the_failure_as_an_error_event(
+    client, storage, headers, monkeypatch
+):
+    guard = GeminiGuard(breaker_threshold=1)
+    monkeypatch.setattr(backend.services, "gemini_guard", guard)
+    backend.services.gemini.set(guard.wrap(BrokenStreamModel()))
+
+    response = client.post(
+        "/api/chat/stream", json={"message": "Hola"}, headers=headers
+    )
+    body = response.get_data(as_text=True)
+
+    assert "event: chunk" in body
+    assert "event: error" in body
+    assert guard.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,97 @@
+import threading
+
+import app as backend
+from seed import sse_events as events
+
+
+def test_replayed_post_creates_a_single_note(client, storage, email, headers):
+    headers = dict(headers, **{"Idempotency-Key": "create-1"})
+
+    first = client.post("/api/notes", json={"title": "Hoy"}, headers=headers)
+    second = client.post("/api/notes", json={"title": "Hoy"}, headers=headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json()["id"] == first.get_json()["id"]
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert len(storage.notes.list_all(email)) == 1
+
+
+def test_same_key_with_another_body_is_rejected(client, storage, email, headers):
+    headers = dict(headers, **{"Idempotency-Key": "create-2"})
+
+    client.post("/api/notes", json={"title": "Hoy"}, headers=headers)
+    response = client.post("/api/notes", json={"title": "Ayer"}, headers=headers)
+
+    assert response.status_code == 422
+    assert len(storage.notes.list_all(email)) == 1
+
+
+def test_requests_without_key_are_not_deduplicated(client, storage, email, headers):
+    for _ in range(2):
+        client.post("/api/notes", json={"title": "Hoy"}, headers=headers)
+
+    assert len(storage.notes.list_all(email)) == 2
+
+
+def saved_messages(storage, uid):
+    # La respuesta se guarda en segundo plano
+    backend.background.flush(5)
+    return len(storage.chat.recent(uid, 10))
+
+
+def stream(client, headers, key, message="Hola", buffered=True):
+    headers = dict(headers, **{"Idempotency-Key": key})
+    response = client.post(
+        "/api/chat/stream", json={"message": message}, headers=headers, buffered=False
+    )
+    if buffered:
+        response.get_data()
+    return response
+
+
+def test_replayed_stream_sends_the_stored_reply_once(client, storage, uid, headers):
+    first = stream(client, headers, "send-1")
+    second = stream(client, headers, "send-1")
+
+    first_events = events(first)
+    assert [event for event, _ in first_events][-1] == "done"
+    assert "chunk" in [event for event, _ in first_events]
+    assert events(second) == [first_events[-1]]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    # Un solo turno guardado: el mensaje del usuario y la respuesta
+    assert saved_messages(storage, uid) == 2
+
+
+def test_concurrent_stream_waits_for_the_first(client, storage, uid, headers):
+    # El primero aún no ha empezado a generar cuando llega el duplicado
+    leader = stream(client, headers, "send-2", buffered=False)
+    replies = []
+    worker = threading.Thread(
+        target=lambda: replies.append(stream(client, headers, "send-2"))
+    )
+    worker.start()
+    leader_events = events(leader)
+    worker.join(5)
+
+    [reply] = replies
+    assert events(reply) == [leader_events[-1]]
+    assert reply.headers["Idempotent-Replayed"] == "true"
+    assert saved_messages(storage, uid) == 2
+
+
+def test_stream_with_another_message_is_rejected(client, storage, headers):
+    stream(client, headers, "send-3", "Hola")
+
+    response = stream(client, headers, "send-3", "Adiós")
+
+    assert response.status_code == 422
+
+
+def test_interrupted_stream_releases_the_key(client, storage, headers):
+    stream(client, headers, "send-4", buffered=False).close()
+
+    retry = stream(client, headers, "send-4")
+
+    assert "Idempotent-Replayed" not in retry.headers
+    assert events(retry)[-1][0] == "done"
@@ -0,0 +1,138 @@
+import gzip
+import json
+import zlib
+from datetime import datetime, timezone
+
+import pytest
+from flask import Response, request
+
+import app as backend
+from compression import ENCODINGS, compress_response, compress_stream
+from json_provider import IsoJSONProvider, OrjsonProvider, create_json_provider
+from models import Note
+from seed import BASE_TIME, add_note
+
+
+class FirestoreDatetime(datetime):
+    """Como DatetimeWithNanoseconds: una subclase de datetime"""
+
+
+def decompress(body, encoding):
+    if encoding == "br":
+        import brotli
+
+        return brotli.decompress(body)
+    return gzip.decompress(body)
+
+
+@pytest.mark.parametrize("provider_class", [OrjsonProvider, IsoJSONProvider])
+def test_providers_serialize_the_same_payload(provider_class):
+    provider = provider_class(backend.app)
+    payload = {
+        "timestamp": BASE_TIME,
+        "updated": FirestoreDatetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "note": Note("a@example.com", "Título", "Día tranquilo", "Feliz", "😊"),
+    }
+
+    assert json.loads(provider.dumps(payload)) == {
+        "timestamp": "2026-01-01T00:00:00+00:00",
+        "updated": "2026-01-02T03:04:05+00:00",
+        "note": {
+            "email": "a@example.com",
+            "title": "Título",
+            "content": "Día tranquilo",
+            "emotion_name": "Feliz",
+            "emotion_emoji": "😊",
+        },
+    }
+    # Sin escapar: los acentos y emojis salen tal cual en UTF-8
+    assert "Título" in provider.dumps(payload)
+    assert provider.loads(provider.dumps({"a": [1, 2]})) == {"a": [1, 2]}
+
+
+def test_orjson_provider_writes_utf8_bytes_directly():
+    provider = OrjsonProvider(backend.app)
+
+    with backend.app.app_context():
+        response = provider.response({"emoji": "😊", 1: "uno"})
+
+    assert response.mimetype == "application/json"
+    assert json.loads(response.get_data()) == {"emoji": "😊", "1": "uno"}
+
+
+def test_missing_orjson_falls_back_to_flask(monkeypatch):
+    monkeypatch.setattr("json_provider.orjson", None)
+
+    provider = create_json_provider(backend.app, "orjson")
+
+    assert type(provider) is IsoJSONProvider
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_large_json_bodies_are_compressed(client, storage, email, headers, encoding):
+    for i in range(30):
+        add_note(storage, email, f"note-{i:02}", BASE_TIME)
+    identity = client.get("/api/notes", headers=headers)
+    assert len(identity.get_data()) >= backend.app.config["COMPRESS_MIN_SIZE"]
+
+    response = client.get(
+        "/api/notes", headers={**headers, "Accept-Encoding": encoding}
+    )
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decompress(response.get_data(), encoding) == identity.get_data()
+
+
+def test_small_or_unaccepted_bodies_stay_identity(client, storage, email, headers):
+    add_note(storage, email, "note-1", BASE_TIME)
+
+    small = client.get("/api/notes", headers={**headers, "Accept-Encoding": "gzip"})
+    assert len(small.get_data()) < backend.app.config["COMPRESS_MIN_SIZE"]
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+
+    for i in range(30):
+        add_note(storage, email, f"note-{i:02}", BASE_TIME)
+    refused = client.get(
+        "/api/notes", headers={**headers, "Accept-Encoding": "identity"}
+    )
+    assert "Content-Encoding" not in refused.headers
+
+
+def test_compression_weakens_strong_etags():
+    body = json.dumps({"items": ["x" * 50] * 50}).encode()
+    response = Response(body, mimetype="application/json")
+    response.set_etag("abc")
+
+    with backend.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        compressed = compress_response(request, response, 1024)
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.get_etag() == ("abc", True)
+    assert gzip.decompress(compressed.get_data()) == body
+
+
+def test_errors_and_other_types_are_left_alone():
+    body = b"x" * 4096
+    with backend.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        error = compress_response(
+            request, Response(body, 500, mimetype="application/json"), 1024
+        )
+        text = compress_response(request, Response(body, mimetype="text/plain"), 1024)
+
+    assert "Content-Encoding" not in error.headers
+    assert "Content-Encoding" not in text.headers
+    assert text.get_data() == body
+
+
+def test_streamed_chunks_decompress_as_they_arrive():
+    chunks = [b"event: chunk\n", b"data: hola\n\n", b"event: done\n"]
+    stream = compress_stream(iter(chunks), "gzip")
+    decompressor = zlib.decompressobj(31)
+
+    # Cada fragmento comprimido se puede leer sin esperar al siguiente
+    for chunk in chunks:
+        assert decompressor.decompress(next(stream)) == chunk
+    decompressor.decompress(next(stream))
+    assert decompressor.eof
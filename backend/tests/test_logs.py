@@ -0,0 +1,44 @@
+import io
+import json
+import logging
+
+import pytest
+
+import logs
+import metrics
+import services
+
+
+@pytest.fixture
+def output():
+    """Salida JSON del árbol "zenith", como la escribe configure()"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logs.JsonFormatter())
+    logger = logging.getLogger(logs.ROOT)
+    logger.addHandler(handler)
+    yield stream
+    logger.removeHandler(handler)
+
+
+def test_module_events_are_written_as_json_with_their_fields(output):
+    services.log.warning("service_init_failed", service="firebase", error="boom")
+
+    entry = json.loads(output.getvalue().splitlines()[-1])
+    assert entry["level"] == "warning"
+    assert entry["event"] == "service_init_failed"
+    assert entry["service"] == "firebase"
+    assert entry["error"] == "boom"
+
+
+def test_module_loggers_hang_from_the_configured_tree():
+    logger = logs.get_logger("storage")._logger
+
+    assert logger.name == "zenith.storage"
+    assert logger.getEffectiveLevel() == logging.getLogger(logs.ROOT).level
+
+
+def test_module_errors_are_counted(output):
+    logs.get_logger("background").error("background_task_failed", task="t")
+
+    assert 'event="background_task_failed"' in metrics.REGISTRY.render()
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import mood_analytics
+from seed import add_note
+
+# Jueves 15 de enero de 2026, mediodía UTC
+NOW = datetime(2026, 1, 15, 12, tzinfo=timezone.utc)
+
+
+def analytics(samples, now=NOW, **kwargs):
+    labels = [label for label, _ in samples]
+    timestamps = [moment.timestamp() for _, moment in samples]
+    emotions, seconds = mood_analytics.notes_to_arrays(labels, timestamps)
+    return mood_analytics.compute_mood_analytics(emotions, seconds, now, **kwargs)
+
+
+def days_ago(days):
+    return NOW - timedelta(days=days)
+
+
+def test_names_and_emojis_map_to_the_same_emotion_and_unknown_are_dropped():
+    result = analytics([("Feliz", NOW), ("😊", NOW), ("🤖", NOW), ("", NOW)])
+
+    assert result["total_notes"] == 2
+    assert result["distribution"]["Feliz"] == 2
+
+
+def test_counts_by_month_and_weekday():
+    result = analytics(
+        [
+            ("Feliz", datetime(2025, 12, 31, tzinfo=timezone.utc)),
+            ("Triste", datetime(2026, 1, 5, tzinfo=timezone.utc)),
+            ("Triste", datetime(2026, 1, 12, tzinfo=timezone.utc)),
+        ]
+    )
+
+    assert [(m["period"], m["total"]) for m in result["by_month"]] == [
+        ("2025-12", 1),
+        ("2026-01", 2),
+    ]
+    # 5 y 12 de enero de 2026 son lunes; 31 de diciembre de 2025, miércoles
+    assert result["by_weekday"]["lunes"]["Triste"] == 2
+    assert result["by_weekday"]["miércoles"]["Feliz"] == 1
+    assert [w["period"] for w in result["by_week"]] == [
+        "2025-12-29",
+        "2026-01-05",
+        "2026-01-12",
+    ]
+
+
+def test_streaks_count_consecutive_days_up_to_yesterday():
+    samples = [("Normal", days_ago(days)) for days in (1, 2, 3, 7, 8)]
+    samples.append(("Normal", days_ago(1)))
+
+    assert analytics(samples)["streaks"] == {"current": 3, "longest": 3}
+    stale = [("Normal", days_ago(days)) for days in (5, 6)]
+    assert analytics(stale)["streaks"] == {"current": 0, "longest": 2}
+
+
+def test_trend_averages_valence_per_day_and_over_windows():
+    result = analytics(
+        [("Feliz", days_ago(1)), ("Triste", days_ago(1)), ("Feliz", NOW)],
+        trend_days=3,
+        windows=(2,),
+    )
+
+    assert result["trend"]["dates"] == ["2026-01-13", "2026-01-14", "2026-01-15"]
+    assert result["trend"]["daily"] == [None, 0.0, 1.0]
+    # Ventana de 2 días el último día: (1 - 1 + 1) / 3 notas
+    assert result["trend"]["rolling_2"] == [None, 0.0, 0.333]
+
+
+def test_endpoint_reads_the_users_notes(client, storage, email, headers):
+    add_note(storage, email, "a", datetime.now(timezone.utc), emoji="😊")
+    add_note(storage, email, "b", datetime.now(timezone.utc), emoji="😢")
+
+    body = client.get("/api/analytics/mood?days=7", headers=headers).get_json()
+
+    assert body["total_notes"] == 2
+    assert body["distribution"]["Feliz"] == body["distribution"]["Triste"] == 1
+    assert len(body["trend"]["dates"]) == 7
+
+
+def test_endpoint_without_notes_returns_empty_analytics(client, storage, headers):
+    body = client.get("/api/analytics/mood", headers=headers).get_json()
+
+    assert body["total_notes"] == 0
+    assert body["by_month"] == [] and body["trend"]["dates"] == []
+    assert client.get("/api/analytics/mood?days=x", headers=headers).status_code == 400
@@ -0,0 +1,55 @@
+import base64
+import json
+from datetime import timedelta
+
+from cursors import encode_cursor
+from seed import BASE_TIME, add_note, collect
+
+
+def test_notes_pages_cover_every_note(client, storage, email, headers):
+    for index in range(17):
+        add_note(storage, email, f"n{index:02d}", BASE_TIME + timedelta(minutes=index))
+
+    pages = collect(client, headers, "/api/notes?page_size=4", "notes")
+
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 1]
+    ids = [note["id"] for page in pages for note in page]
+    assert ids == [f"n{index:02d}" for index in reversed(range(17))]
+
+
+def test_notes_page_size_is_validated_and_clamped(client, storage, email, headers):
+    add_note(storage, email, "n0", BASE_TIME)
+
+    assert client.get("/api/notes?page_size=x", headers=headers).status_code == 400
+    body = client.get("/api/notes?page_size=0", headers=headers).get_json()
+    assert [note["id"] for note in body["notes"]] == ["n0"]
+
+
+def test_notes_with_the_same_timestamp_are_not_skipped(client, storage, email, headers):
+    ids = [f"tie{index}" for index in range(9)]
+    for note_id in ids:
+        add_note(storage, email, note_id, BASE_TIME)
+
+    pages = collect(client, headers, "/api/notes?page_size=4", "notes")
+
+    assert [note["id"] for page in pages for note in page] == ids[::-1]
+
+
+def test_cursor_without_id_still_pages_by_timestamp(client, storage, email, headers):
+    for index in range(3):
+        add_note(storage, email, f"n{index}", BASE_TIME + timedelta(minutes=index))
+
+    cursor = encode_cursor(BASE_TIME + timedelta(minutes=2))
+    body = client.get(f"/api/notes?cursor={cursor}", headers=headers).get_json()
+
+    assert [note["id"] for note in body["notes"]] == ["n1", "n0"]
+
+
+def test_naive_cursor_is_rejected(client, storage, email, headers):
+    payload = json.dumps({"ts": "2026-01-01T00:00:00", "id": "n0"}).encode()
+    cursor = base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    response = client.get(f"/api/notes?cursor={cursor}", headers=headers)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
@@ -0,0 +1,79 @@
+import pytest
+
+import app as backend
+
+PSICOLOGO = {
+    "nombre": "Ana Pérez",
+    "especialidad": "Ansiedad",
+    "telefonoCelular": "555-0100",
+    "telefonoOficina": "555-0101",
+    "correoElectronico": "ana@example.com",
+    "direccion": "Calle 1",
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_directory():
+    # La caché del directorio es global: cada prueba empieza sin ella
+    backend.directory_cache.clear()
+    yield
+    backend.directory_cache.clear()
+
+
+def test_directory_answers_304_while_unchanged(client, headers):
+    first = client.get("/api/psychologists", headers=headers)
+    etag = first.headers["ETag"]
+
+    assert first.status_code == 200
+    assert first.get_json() == []
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = client.get("/api/psychologists", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.get_data() == b""
+
+
+def test_directory_is_read_once_per_ttl(client, storage, headers, monkeypatch):
+    calls = []
+    list_psychologists = storage.psychologists.list
+
+    def counting_list():
+        calls.append(1)
+        return list_psychologists()
+
+    monkeypatch.setattr(storage.psychologists, "list", counting_list)
+
+    for _ in range(3):
+        assert client.get("/api/psychologists", headers=headers).status_code == 200
+
+    assert len(calls) == 1
+
+
+def test_directory_changes_invalidate_the_etag(client, headers):
+    etag = client.get("/api/psychologists", headers=headers).headers["ETag"]
+
+    created = client.post("/api/psychologists", headers=headers, json=PSICOLOGO)
+    assert created.status_code == 201
+    psicologo_id = created.get_json()["id"]
+
+    after_create = client.get(
+        "/api/psychologists", headers={**headers, "If-None-Match": etag}
+    )
+    assert after_create.status_code == 200
+    assert [p["nombre"] for p in after_create.get_json()] == ["Ana Pérez"]
+
+    deleted = client.delete(f"/api/psychologists/{psicologo_id}", headers=headers)
+    assert deleted.status_code == 200
+
+    after_delete = client.get(
+        "/api/psychologists",
+        headers={**headers, "If-None-Match": after_create.headers["ETag"]},
+    )
+    assert after_delete.status_code == 200
+    assert after_delete.get_json() == []
+    # El mismo contenido vuelve a dar el mismo ETag
+    assert after_delete.headers["ETag"] == etag
+
+
+def test_directory_requires_a_token(client):
+    assert client.get("/api/psychologists").status_code == 401
@@ -0,0 +1,95 @@
+import pytest
+
+from models import ChatMessage, Note, Psicologo, ValidationError
+
+PSICOLOGO = {
+    "nombre": "Ana Pérez",
+    "especialidad": "Ansiedad",
+    "telefonoCelular": "555-0100",
+    "telefonoOficina": "555-0101",
+    "correoElectronico": "ana@example.com",
+    "direccion": "Calle 1",
+}
+
+
+def test_schemas_have_no_instance_dict():
+    note = Note("a@example.com", "Título")
+
+    assert not hasattr(note, "__dict__")
+    with pytest.raises(AttributeError):
+        note.extra = 1
+
+
+def test_note_from_json_fills_missing_fields():
+    note = Note.from_json({"title": "Hoy", "emotion_name": "Feliz"}, email="a@x.com")
+
+    assert note.to_dict() == {
+        "email": "a@x.com",
+        "title": "Hoy",
+        "content": "",
+        "emotion_name": "Feliz",
+        "emotion_emoji": "",
+    }
+
+
+def test_psychologist_from_json_round_trips():
+    assert Psicologo.from_json(PSICOLOGO).to_dict() == {
+        **PSICOLOGO,
+        "ubicacionUrl": "",
+        "fotoUrl": "",
+    }
+
+
+@pytest.mark.parametrize(
+    "data,field,message",
+    [
+        (None, None, "Body must be a JSON object"),
+        (["title"], None, "Body must be a JSON object"),
+        ({"title": 5}, "title", "'title' must be a string"),
+        (
+            {"content": "x" * 20001},
+            "content",
+            "'content' must be at most 20000 characters",
+        ),
+    ],
+)
+def test_note_from_json_rejects_bad_bodies(data, field, message):
+    with pytest.raises(ValidationError) as error:
+        Note.from_json(data, email="a@x.com")
+
+    assert error.value.field == field
+    assert str(error.value) == message
+
+
+@pytest.mark.parametrize("data", [{}, {"message": ""}, {"message": None}])
+def test_chat_message_requires_text(data):
+    with pytest.raises(ValidationError, match="Message is required"):
+        ChatMessage.from_json(data, user_id="u", is_user_message=True)
+
+
+@pytest.mark.parametrize(
+    "path,body,error",
+    [
+        ("/api/notes", {"title": ["x"]}, "'title' must be a string"),
+        ("/api/notes", "not json", "Body must be a JSON object"),
+        ("/api/chat/send", {}, "Message is required"),
+        (
+            "/api/chat/send",
+            {"message": "x" * 4001},
+            "'message' must be at most 4000 characters",
+        ),
+        ("/api/chat/stream", {"message": 3}, "'message' must be a string"),
+        ("/api/psychologists", {**PSICOLOGO, "nombre": 1}, "'nombre' must be a string"),
+    ],
+)
+def test_invalid_bodies_get_a_400(client, storage, email, headers, path, body, error):
+    if isinstance(body, str):
+        response = client.post(path, headers=headers, data=body)
+    else:
+        response = client.post(path, headers=headers, json=body)
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": error}
+    # Nada se guarda si el cuerpo no es válido
+    assert storage.notes.list_all(email) == []
+    assert storage.psychologists.list() == []
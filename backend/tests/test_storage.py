@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from seed import BASE_TIME, add_messages
+from storage import SqliteStorage, create_storage
+
+
+def test_notes_round_trip(storage, email):
+    note_id = storage.notes.create(
+        {"email": email, "title": "Hoy", "content": "Bien", "emotion_emoji": "😊"}
+    )
+
+    note = storage.notes.get(note_id)
+    assert note["id"] == note_id
+    assert (note["title"], note["content"], note["emotion_emoji"]) == (
+        "Hoy",
+        "Bien",
+        "😊",
+    )
+    assert isinstance(note["timestamp"], datetime)
+    assert note["timestamp"].tzinfo is not None
+    assert [n["id"] for n in storage.notes.list_all(email)] == [note_id]
+
+    storage.notes.delete(note)
+    assert storage.notes.get(note_id) is None
+    assert storage.notes.list_all(email) == []
+
+
+def test_list_all_returns_only_the_users_notes(storage, email):
+    ids = {storage.notes.create({"email": email}) for _ in range(3)}
+    storage.notes.create({"email": "otra@example.com"})
+
+    assert {n["id"] for n in storage.notes.list_all(email)} == ids
+
+
+def test_recent_messages_are_oldest_first(storage, uid):
+    texts = add_messages(storage, uid, 5)
+    message_id = storage.chat.new_id(uid)
+    storage.chat.add(
+        uid,
+        {
+            "user_id": uid,
+            "text": "nuevo",
+            "is_user_message": True,
+            "timestamp": BASE_TIME + timedelta(minutes=1),
+        },
+        message_id,
+    )
+
+    assert [msg["text"] for msg in storage.chat.recent(uid, 3)] == texts[-2:] + [
+        "nuevo"
+    ]
+    recent = storage.chat.recent(uid, 10, exclude_id=message_id)
+    assert [msg["text"] for msg in recent] == texts
+
+
+def test_summary_round_trip(storage, uid):
+    assert storage.chat.get_summary(uid) == {"summary": "", "summary_until": None}
+
+    storage.chat.set_summary(uid, {"summary": "Resumen", "summary_until": BASE_TIME})
+
+    assert storage.chat.get_summary(uid) == {
+        "summary": "Resumen",
+        "summary_until": BASE_TIME,
+    }
+
+
+def test_clear_deletes_every_message(storage, uid):
+    add_messages(storage, uid, 7)
+
+    assert storage.chat.clear(uid) == 7
+    assert storage.chat.recent(uid, 10) == []
+
+
+def test_psychologists_round_trip(storage):
+    psicologo_id = storage.psychologists.create({"nombre": "Ana"})
+
+    [psicologo] = storage.psychologists.list()
+    assert (psicologo["id"], psicologo["nombre"]) == (psicologo_id, "Ana")
+
+    storage.psychologists.delete(psicologo_id)
+    assert storage.psychologists.list() == []
+
+
+def test_create_storage_picks_the_configured_backend(tmp_path):
+    config = {
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_PATH": str(tmp_path / "zenith.db"),
+        "NOTES_TOMBSTONE_DAYS": 90,
+    }
+
+    assert isinstance(create_storage(config, lambda: None), SqliteStorage)
+    assert (
+        create_storage(dict(config, STORAGE_BACKEND="firestore"), lambda: None) is None
+    )
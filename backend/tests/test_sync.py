@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from seed import BASE_TIME, add_note
+
+
+def sync_all(client, headers, since, limit):
+    """Pide deltas hasta has_more = false; devuelve (notas, borradas, token)"""
+    notes, deleted = [], []
+    for _ in range(50):
+        body = client.get(
+            f"/api/notes/sync?since={since}&limit={limit}", headers=headers
+        ).get_json()
+        assert body["full"] is False
+        notes += [note["id"] for note in body["notes"]]
+        deleted += body["deleted"]
+        since = body["since"]
+        if not body["has_more"]:
+            return notes, deleted, since
+    raise AssertionError("sync did not finish")
+
+
+def initial_token(client, headers):
+    body = client.get("/api/notes/sync?limit=0", headers=headers).get_json()
+    return body["since"]
+
+
+def test_sync_pages_through_notes_with_the_same_updated_at(
+    client, storage, email, headers
+):
+    since = initial_token(client, headers)
+    # Más notas con el mismo updated_at que el tamaño de página
+    stamp = BASE_TIME.replace(year=2100)
+    ids = [f"tie{index:02d}" for index in range(7)]
+    for note_id in ids:
+        add_note(storage, email, note_id, BASE_TIME, updated_at=stamp)
+
+    notes, deleted, _ = sync_all(client, headers, since, 3)
+
+    assert sorted(notes) == ids
+    assert len(notes) == len(set(notes))
+    assert deleted == []
+
+
+def test_sync_reports_deleted_notes(client, storage, email, headers):
+    created = [
+        client.post("/api/notes", json={"title": f"t{i}"}, headers=headers).get_json()[
+            "id"
+        ]
+        for i in range(3)
+    ]
+    since = initial_token(client, headers)
+
+    assert client.delete(f"/api/notes/{created[1]}", headers=headers).status_code == 200
+    new_id = client.post(
+        "/api/notes", json={"title": "t3"}, headers=headers
+    ).get_json()["id"]
+    notes, deleted, since = sync_all(client, headers, since, 2)
+
+    assert new_id in notes
+    assert deleted == [created[1]]
+    # El token nuevo ya no repite los cambios entregados
+    assert sync_all(client, headers, since, 2)[:2] == ([], [])
+
+
+def test_sync_without_since_returns_everything(client, storage, email, headers):
+    for index in range(3):
+        add_note(storage, email, f"n{index}", BASE_TIME + timedelta(minutes=index))
+
+    body = client.get("/api/notes/sync", headers=headers).get_json()
+
+    assert body["full"] is True
+    assert sorted(note["id"] for note in body["notes"]) == ["n0", "n1", "n2"]
+    assert client.get("/api/notes/sync?limit=x", headers=headers).status_code == 400
+
+
+def test_limit_zero_returns_only_the_current_token(client, storage, email, headers):
+    since = initial_token(client, headers)
+    add_note(storage, email, "old", BASE_TIME)
+
+    body = client.get(
+        f"/api/notes/sync?since={since}&limit=0", headers=headers
+    ).get_json()
+
+    assert body["notes"] == [] and body["deleted"] == []
+    assert body["full"] is False and body["has_more"] is False
+    # El token sigue siendo válido para el siguiente delta
+    assert sync_all(client, headers, body["since"], 10)[:2] == ([], [])
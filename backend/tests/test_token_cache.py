@@ -0,0 +1,96 @@
+import pytest
+from firebase_admin import auth
+
+import app as backend
+import cache
+from cache import TTLCache
+
+# La función real: las pruebas de la app usan fake_verify_token
+verify_token = backend.verify_token
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(backend.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def firebase(monkeypatch, clock):
+    """verify_id_token falso que cuenta las llamadas"""
+    calls = []
+
+    def verify_id_token(token, check_revoked=False):
+        calls.append(token)
+        if token == "bad":
+            raise auth.InvalidIdTokenError("bad token")
+        return {"uid": token, "exp": clock[0] + 3600}
+
+    monkeypatch.setattr(auth, "verify_id_token", verify_id_token)
+    monkeypatch.setattr(backend, "get_db", lambda: True)
+    backend.token_cache.clear()
+    yield calls
+    backend.token_cache.clear()
+
+
+def test_entries_expire_after_their_ttl(clock):
+    tokens = TTLCache(maxsize=10, ttl=60)
+    tokens.set("a", 1)
+
+    clock[0] += 59
+    assert tokens.get("a") == 1
+    clock[0] += 1
+    assert tokens.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    tokens = TTLCache(maxsize=2, ttl=60)
+    tokens.set("a", 1)
+    tokens.set("b", 2)
+    tokens.get("a")
+
+    tokens.set("c", 3)
+
+    assert tokens.get("b") is None
+    assert (tokens.get("a"), tokens.get("c")) == (1, 3)
+
+
+def test_verified_token_is_served_from_the_cache(firebase):
+    assert verify_token("user-1")["uid"] == "user-1"
+    assert verify_token("user-1")["uid"] == "user-1"
+
+    assert firebase == ["user-1"]
+
+
+def test_cached_token_is_verified_again_after_the_max_ttl(firebase, clock):
+    verify_token("user-1")
+
+    clock[0] += backend.app.config["TOKEN_CACHE_MAX_TTL"]
+    verify_token("user-1")
+
+    assert firebase == ["user-1", "user-1"]
+
+
+def test_cache_never_outlives_the_token(firebase, clock, monkeypatch):
+    monkeypatch.setattr(
+        auth,
+        "verify_id_token",
+        lambda token, check_revoked=False: (
+            firebase.append(token) or {"uid": token, "exp": clock[0] + 10}
+        ),
+    )
+    verify_token("user-1")
+
+    clock[0] += 10
+    verify_token("user-1")
+
+    assert firebase == ["user-1", "user-1"]
+
+
+def test_invalid_tokens_are_not_cached(firebase):
+    assert verify_token("bad") is None
+    assert verify_token("bad") is None
+
+    assert firebase == ["bad", "bad"]
@@ -0,0 +1,16 @@
+"""
+Timestamps UTC como microsegundos enteros desde 1970: exactos en SQLite (los
+tokens de sincronización comparan por igualdad) y compactos en los archivos
+del chat
+"""
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_micros(timestamp):
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
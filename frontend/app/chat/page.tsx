@@ -17,6 +17,7 @@ export default function ChatPage() {
   const [messages, setMessages] = useState<Message[]>([]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const router = useRouter();
 
@@ -69,8 +70,21 @@ export default function ChatPage() {
     setLoading(true);
 
     try {
-      const response = await chatAPI.sendMessage(userMessage);
-      setMessages(prev => [...prev, { text: response.data.response, isUser: false }]);
+      let started = false;
+      await chatAPI.streamMessage(userMessage, (chunk) => {
+        if (!started) {
+          // `loading` sigue activo hasta el evento done/error: así no se puede
+          // enviar otro mensaje y los fragmentos van siempre a esta respuesta
+          started = true;
+          setStreaming(true);
+          setMessages(prev => [...prev, { text: chunk, isUser: false }]);
+          return;
+        }
+        setMessages(prev => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, text: last.text + chunk }];
+        });
+      });
     } catch (error: any) {
       console.error('Error sending message:', error);
       setMessages(prev => [...prev, {
@@ -79,6 +93,7 @@ export default function ChatPage() {
       }]);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -125,7 +140,7 @@ export default function ChatPage() {
             </div>
           </div>
         ))}
-        {loading && (
+        {loading && !streaming && (
           <div className="flex justify-start">
             <div className="bg-white shadow-md rounded-2xl px-4 py-3">
               <div className="flex gap-2">
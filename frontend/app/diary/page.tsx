@@ -1,10 +1,10 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { onAuthStateChanged } from 'firebase/auth';
 import { auth } from '@/lib/firebase';
-import { notesAPI, emotionsAPI } from '@/lib/api';
+import { notesAPI, emotionsAPI, newIdempotencyKey } from '@/lib/api';
 import Navigation from '@/components/Navigation';
 
 interface Emotion {
@@ -24,6 +24,8 @@ interface Note {
 export default function DiaryPage() {
   const [user, setUser] = useState<any>(null);
   const [notes, setNotes] = useState<Note[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [emotions, setEmotions] = useState<Emotion[]>([]);
   const [showForm, setShowForm] = useState(false);
   const [formData, setFormData] = useState({
@@ -32,6 +34,8 @@ export default function DiaryPage() {
     emotion_name: '',
     emotion_emoji: ''
   });
+  // La misma clave hasta que la nota se guarda: un doble envío crea una sola
+  const draftKey = useRef(newIdempotencyKey());
   const router = useRouter();
 
   useEffect(() => {
@@ -47,15 +51,31 @@ export default function DiaryPage() {
     return () => unsubscribe();
   }, [router]);
 
+  // Primera página; las siguientes se piden con "Cargar más" usando next_cursor
   const loadNotes = async () => {
     try {
-      const response = await notesAPI.getAll();
-      setNotes(response.data);
+      const response = await notesAPI.getPage();
+      setNotes(response.data.notes);
+      setNextCursor(response.data.next_cursor);
     } catch (error) {
       console.error('Error loading notes:', error);
     }
   };
 
+  const loadMoreNotes = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const response = await notesAPI.getPage(nextCursor);
+      setNotes(prev => [...prev, ...response.data.notes]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error loading notes:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const loadEmotions = async () => {
     try {
       const response = await emotionsAPI.getAll();
@@ -68,7 +88,8 @@ export default function DiaryPage() {
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     try {
-      await notesAPI.create(formData);
+      await notesAPI.create(formData, draftKey.current);
+      draftKey.current = newIdempotencyKey();
       setFormData({ title: '', content: '', emotion_name: '', emotion_emoji: '' });
       setShowForm(false);
       await loadNotes();
@@ -81,7 +102,8 @@ export default function DiaryPage() {
     if (window.confirm('¿Estás seguro de eliminar esta nota?')) {
       try {
         await notesAPI.delete(id);
-        loadNotes();
+        // El cursor es el (timestamp, id) de la última nota cargada y sigue valiendo aunque se borre
+        setNotes(prev => prev.filter(note => note.id !== id));
       } catch (error) {
         console.error('Error deleting note:', error);
       }
@@ -195,6 +217,18 @@ export default function DiaryPage() {
             ))
           )}
         </div>
+
+        {nextCursor && (
+          <div className="text-center mt-6">
+            <button
+              onClick={loadMoreNotes}
+              disabled={loadingMore}
+              className="bg-white text-[#02B396] border-2 border-[#02B396] px-6 py-3 rounded-full font-semibold hover:bg-[#02B396]/10 transition disabled:opacity-50"
+            >
+              {loadingMore ? 'Cargando...' : 'Cargar más'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -19,15 +19,83 @@ api.interceptors.request.use(async (config) => {
   return config;
 });
 
+// Una clave por envío: si la petición se repite con la misma clave (doble
+// toque, reintento), el servidor la atiende una sola vez y repite la respuesta
+export const newIdempotencyKey = () =>
+  globalThis.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+// Lee la respuesta del chat como Server-Sent Events y llama a onChunk con cada fragmento
+const streamMessage = async (
+  message: string,
+  onChunk: (text: string) => void,
+  idempotencyKey = newIdempotencyKey(),
+) => {
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+    'Idempotency-Key': idempotencyKey,
+  };
+  const user = auth.currentUser;
+  if (user) {
+    headers.Authorization = `Bearer ${await user.getIdToken()}`;
+  }
+
+  const response = await fetch(`${API_URL}/api/chat/stream`, {
+    method: 'POST',
+    headers,
+    body: JSON.stringify({ message }),
+  });
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => ({}));
+    throw new Error(data.error || `HTTP ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let fullText = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const events = buffer.split('\n\n');
+    buffer = events.pop() || '';
+    for (const raw of events) {
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+      if (event === 'chunk') {
+        fullText += data.text;
+        onChunk(data.text);
+      } else if (event === 'error') {
+        throw new Error(data.error);
+      } else if (event === 'done') {
+        // Un envío repetido recibe la respuesta guardada en un solo evento
+        if (!fullText && data.response) onChunk(data.response);
+        fullText = data.response;
+      }
+    }
+  }
+
+  return fullText;
+};
+
 export const chatAPI = {
   getHistory: (limit = 10) => api.get(`/chat/history?limit=${limit}`),
-  sendMessage: (message: string) => api.post('/chat/send', { message }),
+  getHistoryPage: (cursor?: string | null, pageSize = 20) =>
+    api.get('/chat/history', { params: { page_size: pageSize, cursor: cursor || '' } }),
+  sendMessage: (message: string, idempotencyKey = newIdempotencyKey()) =>
+    api.post('/chat/send', { message }, { headers: { 'Idempotency-Key': idempotencyKey } }),
+  streamMessage,
   clearHistory: () => api.delete('/chat/clear'),
 };
 
 export const notesAPI = {
-  getAll: () => api.get('/notes'),
-  create: (note: any) => api.post('/notes', note),
+  getAll: () => api.get('/notes', { params: { all: 1 } }),
+  getPage: (cursor?: string | null, pageSize = 20) =>
+    api.get('/notes', { params: { page_size: pageSize, cursor: cursor || '' } }),
+  create: (note: any, idempotencyKey = newIdempotencyKey()) =>
+    api.post('/notes', note, { headers: { 'Idempotency-Key': idempotencyKey } }),
   delete: (id: string) => api.delete(`/notes/${id}`),
 };
 
@@ -46,4 +114,10 @@ export const tipsAPI = {
   getAll: () => api.get('/tips'),
 };
 
+// Varias lecturas GET en un solo viaje (rutas completas, p. ej. '/api/tips');
+// responde { responses: [{ id, status, body }] } en el mismo orden
+export const batchAPI = {
+  get: (requests: { id?: string; path: string }[]) => api.post('/batch', { requests }),
+};
+
 export default api;